@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 19:02:36
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 19:02:36
+
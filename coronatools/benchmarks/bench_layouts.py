@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 19:13:13
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 20:02:47
+
+"""
+Session cost : construct() of each layout and typical interactions, in an unattached Document
+
+python benchmarks/bench_layouts.py [--data bundled|scaled|synthetic] [--factor 10] [--locations 1000] [--days 200] [--repeat 5]
+                                   [--output results.json] [--baseline results.json] [--threshold 1.25]
+
+Results are written as json (ms per call, min and median over repeats). With --baseline, the
+script exits with an error if a median is slower than baseline * threshold.
+"""
+
+import os
+rpath = os.path.realpath(__file__)
+dname = os.path.dirname
+
+import sys
+sys.path.insert(0, dname(dname(rpath)))
+
+import json
+import time
+import platform
+import argparse
+import traceback
+import statistics
+from itertools import cycle
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from bokeh.document import Document
+from bokeh.models import DateSlider, Select, RadioButtonGroup
+from bokeh.models import DataTable as BDataTable
+
+from componments.base.utils import SignalControl
+from componments.base.axpanels import PanelAxisTypes as PAT
+from componments.pgcd.mlp import MultiLinesPlotScatter
+from dataset.cube import CubeCoronaData
+from dataset.snapshot import DatasetSnapshot, SnapshotHandle
+from dataset.synthetic import SyntheticCoronaData
+from layouts import worldmap, barplot, compare, locstat
+from server import utils as sutils
+
+LAYOUTS = {"worldmap" : worldmap, "barplot" : barplot, "compare" : compare, "locstat" : locstat}
+
+# ---------------------------------------------------------------------------
+# Data
+
+class ScaledData() :
+
+    """
+    Bundled data where each location is replicated factor times ("France", "France #1" ...).
+    Replicas share geometries and regions, aggregated levels are factor times bigger.
+    """
+
+    def __init__(self, pgcd, factor) :
+        self._pgcd = pgcd
+        self._factor = factor
+        self._gdf = ScaledData.replicate(pgcd.load_gdf(default_detail=110), factor)
+        self._cdf = ScaledData.replicate(pgcd.cdf, factor)
+
+    @staticmethod
+    def replicate(df, factor) :
+        # Country can be categorical, string concatenation needs str values
+        frames = [df] + [df.assign(Country=df["Country"].astype(str) + f" #{idx}") for idx in range(1, factor)]
+        return pd.concat(frames, ignore_index=True)
+
+    @property
+    def cdf(self):
+        return self._cdf
+
+    @property
+    def gdf(self):
+        return self._gdf
+
+    def load_gdf(self, ** kwargs) :
+        return self._gdf
+
+    def df2gdf(self, df, column, light=True) :
+        return self._gdf[[column, "geometry"]].merge(df, on=column, how="right")
+
+    def snapshot(self) :
+        return DatasetSnapshot(self, frame=self.cdf, backend=CubeCoronaData(self.cdf, self))
+
+def load_data(name, factor=1, nlocations=1000, ndays=200) :
+    # synthetic data do not need the bundled file nor pycoronadata
+    if name == "synthetic" : return SyntheticCoronaData(nlocations, ndays)
+
+    pgcd = sutils.shared_pgcd()
+    if name == "bundled" : return pgcd
+    if name == "scaled" : return ScaledData(pgcd, factor).snapshot()
+    raise ValueError(f"Unknown data : {name}")
+
+def data_info(pgcd) :
+    return {"locations" : len(pgcd.unique("Country")), "days" : (pgcd.lastday() - pgcd.firstday()).days + 1}
+
+# ---------------------------------------------------------------------------
+# Measures
+
+def timeit(fun, repeat) :
+    times = []
+    for idx in range(repeat) :
+        start = time.perf_counter()
+        fun()
+        times.append((time.perf_counter() - start) * 1000)
+    return {"min" : min(times), "median" : statistics.median(times), "repeat" : repeat}
+
+def measure(fun, repeat) :
+    # A failing benchmark is reported, not fatal
+    try : return timeit(fun, repeat)
+    except Exception as e :
+        traceback.print_exc()
+        return {"error" : f"{type(e).__name__}: {e}"}
+
+def construct_layout(module, pgcd) :
+    controller = SignalControl()
+    handle = SnapshotHandle(pgcd)
+    root = module.construct(handle, controller)
+    document = Document()
+    document.add_root(root)
+    return root
+
+def toggle(model, attr, values) :
+    # Each call moves the model to the next value
+    values = cycle(values)
+    def fun() :
+        setattr(model, attr, next(values))
+    return fun
+
+def release(slider, values) :
+    # Slider moved and released by the client, value_throttled is read only server side
+    values = cycle(values)
+    def fun() :
+        old, slider.value = slider.value, next(values)
+        slider.trigger("value_throttled", old, slider.value)
+    return fun
+
+def date_steps(slider, pgcd, released=False) :
+    # One day backward at each call, from the last day
+    lastday, ndays = pgcd.lastday(), data_info(pgcd)["days"]
+    days = [lastday - timedelta(days=idx) for idx in range(1, ndays)] + [lastday]
+    return release(slider, days) if released else toggle(slider, "value", days)
+
+def others(select) :
+    # Select options, current value last
+    return [value for value in select.options if value != select.value] + [select.value]
+
+def select(root, ** kwargs) :
+    model = root.select_one(kwargs)
+    if model is None : raise LookupError(f"No model found with {kwargs}")
+    return model
+
+def worldmap_interactions(root, pgcd) :
+    slider = select(root, type=DateSlider)
+    metric = [model for model in root.select({"type" : Select}) if "Confirmed" in model.options][0]
+    mapper = [model for model in root.select({"type" : Select}) if model is not metric][0]
+
+    return {
+        "date_step" : date_steps(slider, pgcd),
+        "metric_switch" : toggle(metric, "value", ["Deaths", "Confirmed"]),
+        "mapper_switch" : toggle(mapper, "value", others(mapper))
+        }
+
+def barplot_interactions(root, pgcd) :
+    return {
+        "date_step" : date_steps(select(root, type=DateSlider), pgcd, released=True),
+        "region_switch" : toggle(select(root, type=Select, title="Region"), "value", ["Continent", "Country"]),
+        "metric_switch" : toggle(select(root, type=Select, title="Sort by"), "value", ["Deaths", "Confirmed"])
+        }
+
+def locstat_interactions(root, pgcd) :
+    location = select(root, type=Select, title="Location")
+
+    return {
+        "location_switch" : toggle(location, "value", others(location)),
+        "kind_switch" : toggle(select(root, type=Select, title="Cases type"), "value", ["Daily cases", "Cumulative cases"]),
+        "region_switch" : toggle(select(root, type=Select, title="Region"), "value", ["Country", "Continent"])
+        }
+
+def compare_interactions(root, pgcd) :
+    selected = select(root, type=BDataTable).source.selected
+    indices = list(selected.indices)
+    added = indices + [idx for idx in range(len(select(root, type=BDataTable).source.data["Location"])) if idx not in indices][:1]
+
+    return {
+        "add_location" : toggle(selected, "indices", [added, indices]),
+        "remove_location" : toggle(selected, "indices", [indices[:-1], indices]),
+        "metric_switch" : toggle(select(root, type=Select, title="Y axis"), "value", ["Deaths", "Confirmed"]),
+        "region_switch" : toggle(select(root, type=RadioButtonGroup), "active", [1, 0])
+        }
+
+INTERACTIONS = {"worldmap" : worldmap_interactions, "barplot" : barplot_interactions,
+                "compare" : compare_interactions, "locstat" : locstat_interactions}
+
+def axpanels_benchmarks(pgcd, repeat, shared=False) :
+    # PanelAxisTypes with the compare layout plot, linear and log panels
+    axtypes = (PAT.axis_type(title="Linear", x="datetime", y="linear"),
+               PAT.axis_type(title="Log", x="datetime", y="log", kwargs={"replace_zero" : np.nan}))
+
+    results = {}
+    build = lambda : PAT(MultiLinesPlotScatter, axtypes, pgcd, gcol="Continent", xcol="Date", ycol="Confirmed", shared=shared)
+    results["construct"] = measure(build, repeat)
+
+    try : mlp = build()
+    except Exception : return results
+
+    locations = pgcd.unique("Continent")
+    results["change_locations"] = measure(toggle_call(mlp.change_locations,
+        [locations, locations[:len(locations) // 2]]), repeat)
+    results["ycol_switch"] = measure(toggle(mlp, "ycol", ["Deaths", "Confirmed"]), repeat)
+
+    return results
+
+def toggle_call(fun, values) :
+    values = cycle(values)
+    return lambda : fun(next(values))
+
+def run_layout(name, pgcd, repeat) :
+    module = LAYOUTS[name]
+    results = {"construct" : measure(lambda : construct_layout(module, pgcd), repeat)}
+
+    try : root = construct_layout(module, pgcd)
+    except Exception : return results
+
+    try : interactions = INTERACTIONS[name](root, pgcd)
+    except Exception as e :
+        results["interactions"] = {"error" : f"{type(e).__name__}: {e}"}
+        return results
+
+    for iname, fun in interactions.items() :
+        results[iname] = measure(fun, repeat)
+
+    return results
+
+def run(pgcd, repeat, layouts=tuple(LAYOUTS)) :
+    benchmarks = {name : run_layout(name, pgcd, repeat) for name in layouts}
+    benchmarks["axpanels"] = axpanels_benchmarks(pgcd, repeat)
+    benchmarks["axpanels_shared"] = axpanels_benchmarks(pgcd, repeat, shared=True)
+    return benchmarks
+
+# ---------------------------------------------------------------------------
+# Reports
+
+def flatten(benchmarks) :
+    return {f"{group}.{name}" : result for group, values in benchmarks.items() for name, result in values.items()}
+
+def show(benchmarks) :
+    print (f"{'benchmark':<34}{'min (ms)':>12}{'median (ms)':>14}")
+    for name, result in flatten(benchmarks).items() :
+        if "error" in result : print (f"{name:<34}  {result['error']}")
+        else : print (f"{name:<34}{result['min']:>12.2f}{result['median']:>14.2f}")
+
+def regressions(benchmarks, baseline, threshold) :
+    # Benchmarks slower than baseline * threshold, or failing while they passed in baseline
+    current, baseline = flatten(benchmarks), flatten(baseline["benchmarks"])
+    found = []
+
+    for name, reference in baseline.items() :
+        result = current.get(name)
+        if result is None or "error" in reference : continue
+        if "error" in result : found.append((name, reference["median"], None))
+        elif result["median"] > reference["median"] * threshold : found.append((name, reference["median"], result["median"]))
+
+    return found
+
+def main(args) :
+    pgcd = load_data(args.data, args.factor, args.locations, args.days)
+    benchmarks = run(pgcd, args.repeat, args.layouts)
+    show(benchmarks)
+
+    results = {
+        "date" : datetime.now().isoformat(timespec="seconds"),
+        "python" : platform.python_version(),
+        "data" : {"name" : args.data, ** data_info(pgcd)},
+        "benchmarks" : benchmarks
+        }
+
+    if args.output :
+        with open(args.output, "w") as f :
+            json.dump(results, f, indent=2)
+
+    if args.baseline :
+        with open(args.baseline) as f :
+            baseline = json.load(f)
+
+        found = regressions(benchmarks, baseline, args.threshold)
+        for name, reference, median in found :
+            if median is None : print (f"REGRESSION {name} : fails (baseline {reference:.2f} ms)")
+            else : print (f"REGRESSION {name} : {median:.2f} ms (baseline {reference:.2f} ms)")
+        if found : sys.exit(1)
+
+if __name__ == "__main__" :
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", choices=["bundled", "scaled", "synthetic"], default="bundled")
+    parser.add_argument("--factor", type=int, default=10, help="Replication factor of locations for scaled data")
+    parser.add_argument("--locations", type=int, default=1000, help="Number of locations for synthetic data")
+    parser.add_argument("--days", type=int, default=200, help="Number of days for synthetic data")
+    parser.add_argument("--layouts", nargs="+", choices=list(LAYOUTS), default=list(LAYOUTS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Json results file")
+    parser.add_argument("--baseline", help="Json results file to compare with")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    main(parser.parse_args())
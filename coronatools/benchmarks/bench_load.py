@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 19:02:36
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 20:04:58
+
+"""
+Startup time of the data file : DatasetSnapshot.from_file (the server startup path) for each backend,
+and for reference the raw csv parsing (pycoronadata always parses the csv, see dataset.snapshot).
+
+python benchmarks/bench_load.py [--fname server/data.csv] [--repeat 20]
+"""
+
+import os
+rpath = os.path.realpath(__file__)
+dname = os.path.dirname
+
+import sys
+sys.path.insert(0, dname(dname(rpath)))
+
+import time
+import argparse
+
+import pandas as pd
+
+from dataset.snapshot import DatasetSnapshot
+
+def timeit(fun, repeat) :
+    times = []
+    for _ in range(repeat) :
+        start = time.perf_counter()
+        fun()
+        times.append(time.perf_counter() - start)
+    return min(times), sum(times) / len(times)
+
+def touch_frame(df) :
+    # same work on each frame after the load
+    return df.select_dtypes("number").sum().sum()
+
+def run(fname, repeat) :
+    paths = {
+        "from_file pgcd" : lambda : touch_frame(DatasetSnapshot.from_file(fname, backend="pgcd").cdf),
+        "from_file cube" : lambda : touch_frame(DatasetSnapshot.from_file(fname, backend="cube").cdf),
+        "csv only" : lambda : touch_frame(pd.read_csv(fname))
+        }
+
+    print (f"{'load path':<18}{'best (ms)':>12}{'mean (ms)':>12}")
+    results = {}
+    for name, fun in paths.items() :
+        best, mean = timeit(fun, repeat)
+        results[name] = best
+        print (f"{name:<18}{best * 1000:>12.2f}{mean * 1000:>12.2f}")
+    return results
+
+if __name__ == "__main__" :
+    default = os.path.join(dname(dname(rpath)), "server", "data.csv")
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fname", default=default)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.fname, args.repeat)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 19:17:50
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 19:21:29
+
+"""
+MultiLinesPlot sources, python lists (previous implementation) against numpy arrays
+
+python benchmarks/bench_mlp.py [--lines 200] [--days 1000] [--repeat 5]
+"""
+
+import os
+rpath = os.path.realpath(__file__)
+dname = os.path.dirname
+
+import sys
+sys.path.insert(0, dname(dname(rpath)))
+
+import time
+import argparse
+import statistics
+
+import numpy as np
+import pandas as pd
+
+from bokeh.document import Document
+
+from benchmarks.bench_wmap_payload import patch_size
+from componments.base.mlp import MultiLinesPlot
+
+def make_df(nlines, ndays, seed=0) :
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2020-01-22", periods=ndays, freq="D")
+    values = rng.integers(0, 1000, (ndays, nlines)).cumsum(axis=0)
+    return pd.DataFrame(values, index=index, columns=[f"Location {idx}" for idx in range(nlines)])
+
+def legacy_sources(mlp, df) :
+    # lists built value by value, as before
+    data = {"hue" : [], "colors" : [], "xs" : [], "ys" : []}
+    for column in sorted(df.columns) :
+        data["hue"].append(column)
+        data["xs"].append(list(df.index))
+        data["ys"].append(list(df[column]))
+        data["colors"].append("#1f77b4")
+
+    ndata = {"xs" : [], "ys" : [], "fcolors" : [], "alpha": []}
+    for idx, color in enumerate(data["colors"]) :
+        ndata["xs"].extend(data["xs"][idx])
+        ndata["ys"].extend(data["ys"][idx])
+        ndata["fcolors"].extend([color] * len(data["xs"][idx]))
+        ndata["alpha"].extend([mlp.default_alpha] * len(data["xs"][idx]))
+
+    return data, ndata
+
+def array_sources(mlp, df) :
+    data = mlp.make_data_source(df)
+    return data, mlp.make_data_scatter_source(data)
+
+def timeit(fun, repeat) :
+    times = []
+    for idx in range(repeat) :
+        start = time.perf_counter()
+        fun()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+def send(mlp, fun, df) :
+    # Sources update and websocket message of the change
+    events = []
+    mlp.figure.document.on_change(lambda event : events.append(event))
+    data, ndata = fun(mlp, df)
+    mlp._source.data = data
+    mlp._source_scatter.data = ndata
+    return patch_size(events)
+
+def run(nlines, ndays, repeat) :
+    df = make_df(nlines, ndays)
+
+    results = {}
+    for name, fun in (("lists", legacy_sources), ("arrays", array_sources)) :
+        mlp = MultiLinesPlot(x_axis_type="datetime", legend_location=None)
+        Document().add_root(mlp.figure)
+
+        build = timeit(lambda : fun(mlp, df), repeat)
+        total = timeit(lambda : send(mlp, fun, df), repeat)
+        results[name] = {"build" : build, "send" : total, "message" : send(mlp, fun, df)}
+
+    print (f"{nlines} lines x {ndays} days")
+    print (f"{'sources':<10}{'build (ms)':>14}{'build + message (ms)':>24}{'message (B)':>16}")
+    for name, result in results.items() :
+        print (f"{name:<10}{result['build']:>14.1f}{result['send']:>24.1f}{result['message']:>16,}")
+
+    print (f"build speedup : {results['lists']['build'] / results['arrays']['build']:.1f}x")
+    return results
+
+if __name__ == "__main__" :
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=200)
+    parser.add_argument("--days", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.lines, args.days, args.repeat)
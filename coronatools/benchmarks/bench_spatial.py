@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 19:05:44
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 19:48:51
+
+"""
+Doubletap hit testing, linear scan over all polygons against the spatial index
+
+python benchmarks/bench_spatial.py [--polygons 5000] [--queries 500]
+"""
+
+import os
+rpath = os.path.realpath(__file__)
+dname = os.path.dirname
+
+import sys
+sys.path.insert(0, dname(dname(rpath)))
+
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from shapely.geometry import Point
+
+from componments.base.spatial import SpatialIndex
+from dataset.synthetic import make_polygons, location_names
+
+def make_gdf(count) :
+    return pd.DataFrame({"Country" : location_names(count), "geometry" : make_polygons(count)})
+
+def linear_scan(gdf, x, y) :
+    point = Point(x, y)
+    return list(gdf[gdf["geometry"].apply(lambda polygone : polygone.contains(point))]["Country"])
+
+def run(count, nqueries) :
+    gdf = make_gdf(count)
+    rng = np.random.default_rng(1)
+    queries = list(zip(rng.uniform(-180, 180, nqueries), rng.uniform(-90, 90, nqueries)))
+
+    start = time.perf_counter()
+    index = SpatialIndex(gdf["geometry"], gdf["Country"])
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = [linear_scan(gdf, x, y) for x, y in queries]
+    tlinear = (time.perf_counter() - start) / nqueries
+
+    start = time.perf_counter()
+    found = [index.query(x, y) for x, y in queries]
+    tindex = (time.perf_counter() - start) / nqueries
+
+    if found != expected : raise Exception("Spatial index and linear scan results differ")
+
+    print (f"{count} polygons, {nqueries} queries")
+    print (f"index build        : {build * 1000:.2f} ms")
+    print (f"linear scan / tap  : {tlinear * 1000:.3f} ms")
+    print (f"index query / tap  : {tindex * 1000:.3f} ms")
+    print (f"speedup            : {tlinear / tindex:.0f}x")
+
+if __name__ == "__main__" :
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--polygons", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+    run(args.polygons, args.queries)
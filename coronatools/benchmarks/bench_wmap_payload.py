@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 19:05:13
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 19:40:42
+
+"""
+Websocket payload of the worldmap, with geojson (full resend) and static geometry (values only)
+With static geometry, also the finer patches sent when zooming on a few viewports (see WMap.link_viewport)
+
+python benchmarks/bench_wmap_payload.py [--days 10]
+"""
+
+import os
+rpath = os.path.realpath(__file__)
+dname = os.path.dirname
+
+import sys
+sys.path.insert(0, dname(dname(rpath)))
+
+import json
+import argparse
+from datetime import timedelta
+
+from bokeh.document import Document
+from bokeh.protocol import Protocol
+
+from componments.pgcd.wmap import WMap
+from server import utils as sutils
+import layouts.utils as lutils
+
+def message_size(msg) :
+    size = len(msg.header_json) + len(msg.metadata_json) + len(msg.content_json)
+    return size + sum(len(header) + len(payload) for header, payload in msg.buffers)
+
+def patch_size(events) :
+    if not events : return 0
+    return message_size(Protocol().create("PATCH-DOC", events))
+
+def measure(pgcd, static_geometry, days) :
+    carto = WMap(pgcd, pgcd.lastday(), "Confirmed", tooltips=lutils.tooltips(), static_geometry=static_geometry)
+
+    document = Document()
+    document.add_root(carto.figure)
+    initial = len(json.dumps(document.to_json()))
+
+    events = []
+    document.on_change(lambda event : events.append(event))
+
+    sizes = []
+    for idx in range(1, days + 1) :
+        carto.date = pgcd.lastday() - timedelta(days=idx)
+        sizes.append(patch_size(events))
+        events.clear()
+
+    carto.field = "Deaths"
+    field_size = patch_size(events)
+    events.clear()
+
+    results = {"document" : initial, "date_change" : sum(sizes) / len(sizes), "field_change" : field_size}
+    if static_geometry : results["zoom"] = measure_zoom(carto, events)
+    return results
+
+# (x0, x1, y0, y1), the world again at the end
+VIEWPORTS = {"Europe" : (-25, 45, 34, 72), "France" : (-5, 10, 41, 52), "World" : (-180, 180, -90, 90)}
+
+def measure_zoom(carto, events) :
+    carto.link_viewport()
+    sizes = {}
+    for name, bounds in VIEWPORTS.items() :
+        carto.set_viewport(bounds)
+        sizes[name] = patch_size(events)
+        events.clear()
+    return sizes
+
+def run(pgcd, days) :
+    results = {
+        "geojson" : measure(pgcd, False, days),
+        "static geometry" : measure(pgcd, True, days)
+        }
+
+    print (f"{'mode':<18}{'document (B)':>16}{'date change (B)':>18}{'field change (B)':>18}")
+    for name, result in results.items() :
+        print (f"{name:<18}{result['document']:>16,}{result['date_change']:>18,.0f}{result['field_change']:>18,}")
+
+    ratio = results["geojson"]["date_change"] / results["static geometry"]["date_change"]
+    print (f"date change payload reduction : {ratio:.1f}x")
+
+    for name, size in results["static geometry"]["zoom"].items() :
+        print (f"zoom to {name:<10}{size:>18,} B")
+    return results
+
+if __name__ == "__main__" :
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=10)
+    args = parser.parse_args()
+    run(sutils.shared_pgcd(), args.days)
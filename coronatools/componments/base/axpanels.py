@@ -2,7 +2,7 @@
 # @Author: jsgounot
 # @Date:   2020-04-05 11:56:24
 # @Last modified by:   jsgounot
-# @Last Modified time: 2020-04-15 13:27:51
+# @Last Modified time: 2026-10-17 19:23:33
 
 import copy
 from collections import namedtuple
@@ -14,17 +14,19 @@ class PanelAxisTypes() :
 
     """    
     A single class to mix similar plots but with different ax types (linear, log for example)
-    The current solution is convenient but is not efficient, each plot are unique and everything is duplicated
-    A better solution would be to be able to change ax type on figure, which is not currently available
+    Changing ax type on a figure is not currently available, we need one figure per type
     see : https://discourse.bokeh.org/t/dynamic-change-scale-from-linear-to-log/5100/3
-    Or to share a specific number of function and arguments (for example : source), but would need a specific work for each
-    class (maybe using inheritence)
+
+    By default, each plot is unique and everything is duplicated (data work and data sent).
+    With shared=True, the first plot is the master and the others are built with master=first :
+    they draw the master sources. Attributes and methods listed in master_class.master_only
+    (data work) are only set or called on the master, everything else on all plots.
     """
 
     dat = default_axis_type = namedtuple("PanelAxisTypeInfo", ["title", "x", "y", "kwargs"],
         defaults=["linear", "linear", {}])
 
-    def __init__(self, master_class, axis_types, * args, ** kwargs) :
+    def __init__(self, master_class, axis_types, * args, shared=False, ** kwargs) :
         instances = []
         panels = []
 
@@ -36,6 +38,7 @@ class PanelAxisTypes() :
             instance_kwargs = copy.deepcopy(kwargs)
             subkwargs = {"x_axis_type" : axis_type.x, "y_axis_type" : axis_type.y, ** axis_type.kwargs}
             instance_kwargs.update(subkwargs)
+            if shared and instances : instance_kwargs["master"] = instances[0]
 
             instance = master_class(* args, ** instance_kwargs)
             instances.append(instance)
@@ -47,13 +50,19 @@ class PanelAxisTypes() :
             raise ValueError("Cannot create an empty PanelAxisTypes instance")
 
         self._instances = instances
+        self._master_only = master_class.master_only if shared else ()
         self._tabs = Tabs(tabs=panels)
         self._fun_name = None
 
+    def targets(self, name) :
+        # instances receiving this attribute or method call
+        if name in self._master_only : return self._instances[:1]
+        return self._instances
+
     def __setattr__(self, name, value) :
         # condition order is important here !
 
-        init = ("_instances", "_tabs", "_fun_name")
+        init = ("_instances", "_master_only", "_tabs", "_fun_name")
         if name in init : 
             super().__setattr__(name, value)
         
@@ -64,7 +73,7 @@ class PanelAxisTypes() :
             super().__setattr__(name, value)    
 
         else : 
-            for instance in self._instances :
+            for instance in self.targets(name) :
                 setattr(instance, name, value)
 
     def __getattr__(self, name) :
@@ -78,7 +87,7 @@ class PanelAxisTypes() :
 
     def wrapper_function(self, * args, ** kwargs) :
         if self._fun_name is None : raise InternalError("fun_name cannot be set to None")
-        for instance in self._instances :
+        for instance in self.targets(self._fun_name) :
             getattr(instance, self._fun_name)(* args, ** kwargs)
     
     @property
@@ -2,15 +2,52 @@
 # @Author: jsgounot
 # @Date:   2020-03-26 12:35:34
 # @Last modified by:   jsgounot
-# @Last Modified time: 2020-04-05 12:00:10
+# @Last Modified time: 2026-10-17 20:02:47
+
+import numpy as np
 
 from bokeh.plotting import figure
-from bokeh.models import HoverTool, ColumnDataSource
+from bokeh.models import HoverTool, ColumnDataSource, CustomJS
 from bokeh.events import DoubleTap
 
 from componments.base.utils import BaseChart, ToolTips
 from componments.base.errors import SourceException
 
+# Client side scrubbing, see DynamicBarPlot.link_scrubber
+# frames.data : each column as a days x topk matrix (row major), sorted bars of each day
+# frames.data[columnx] : codes of frames.tags[2] (names), -1 when a day has less than topk bars
+# frames.tags : [first day in ms, topk, names]
+SCRUB_CODE = """
+const codes = frames.data[columnx]
+if (codes == null || codes.length == 0) return
+
+const start = frames.tags[0], topk = frames.tags[1], names = frames.tags[2]
+const ndays = Math.floor(codes.length / topk)
+
+// more bars than the frames have, only the server can draw them
+if (Math.round(ndisplay.value) > topk) return
+
+const day = Math.min(Math.max(Math.round((date.value - start) / 86400000), 0), ndays - 1)
+const offset = day * topk
+const limit = Math.round(ndisplay.value)
+
+let count = 0
+while (count < limit && codes[offset + count] >= 0) count++
+
+// local change only, source.data itself is not reassigned so nothing is sent to the server
+const data = source.data
+for (const column in data) {
+    if (column == columnx) data[column] = Array.from(codes.slice(offset, offset + count), code => names[code])
+    else if (column in frames.data) data[column] = frames.data[column].slice(offset, offset + count)
+    else data[column] = new Array(count).fill(NaN)
+}
+
+data.bottom = new Array(count).fill(0)
+data.left = Array.from({length: count}, (value, idx) => idx - pad)
+data.right = Array.from({length: count}, (value, idx) => idx + pad)
+source.change.emit()
+"""
+
 class DynamicBarPlot(BaseChart) :
 
     def __init__(self, columnx, columny, ndisplay, * args, tooltips=None, width=.8, 
@@ -42,6 +79,10 @@ class DynamicBarPlot(BaseChart) :
         self._columnx = columnx
         self._columny = columny
 
+        # Client side scrubbing, see link_scrubber
+        self._frames = None
+        self._topk = None
+
         super().__init__()
 
     @staticmethod
@@ -75,6 +116,14 @@ class DynamicBarPlot(BaseChart) :
     @property
     def width(self):
         return self._width
+
+    @property
+    def scrubbing(self):
+        return self._frames is not None
+
+    @property
+    def topk(self):
+        return self._topk
     
     @property
     def pad(self):
@@ -83,7 +132,6 @@ class DynamicBarPlot(BaseChart) :
     @df.setter
     def df(self, df) :
         #df = df[[self.columnx, self.columny]]
-        df = self.fill_df(df)
         self._df = df
         self.set_data_source()
 
@@ -96,21 +144,44 @@ class DynamicBarPlot(BaseChart) :
     def width(self, width) :
         if width > 1 : raise ValueError("width must be <= 1")
         self._width = width
-        self.df = self.fill_df(self.df)
         self.set_data_source()    
 
     def fill_df(self, df) :
+        # bars geometry, only for the shown rows
+        position = np.arange(len(df))
         df["bottom"] = 0
-        df["left"] = df["right"] = list(range(len(df)))
-        df["left"] = df["left"] - self.pad
-        df["right"] = df["right"] + self.pad
+        df["left"] = position - self.pad
+        df["right"] = position + self.pad
         return df
 
     def set_data_source(self, df=None) :
-        df = df or self.df
-        df = df.head(self.ndisplay)
-        if df.empty : raise ValuError("No data source to provide")
-        self.source.data = df
+        df = self.df if df is None else df
+        df = df.head(self.ndisplay).copy()
+        if df.empty : raise ValueError("No data source to provide")
+        self.source.data = self.fill_df(df)
+
+    def link_scrubber(self, date, ndisplay, topk=30) :
+        # Date (slider) and ndisplay changes are drawn client side from frames (see set_frames)
+        # up to topk bars, above that the server update (link_on_change of both sliders) draws them
+        # sliders should be linked on value_throttled, server frames sent during a drag could
+        # arrive after the client drew a later day
+        self._topk = topk
+        self._frames = ColumnDataSource(data={})
+
+        args = dict(source=self.source, frames=self._frames, date=date, ndisplay=ndisplay,
+                    columnx=self.columnx, pad=self.pad)
+        callback = CustomJS(args=args, code=SCRUB_CODE)
+        date.js_on_change("value", callback)
+        ndisplay.js_on_change("value", callback)
+
+    def set_frames(self, firstday, names, frames) :
+        # frames : column : days x topk matrix, columnx with codes of names
+        start = int(np.datetime64(firstday, "D").astype(np.int64)) * 86400000
+        self._frames.tags = [start, self.topk, list(names)]
+        self._frames.data = {column : np.ravel(values) for column, values in frames.items()}
+
+    def clear_frames(self) :
+        if self._frames.data : self._frames.data = {}
 
     def doubletap(self, event) :
         df = self.source.data
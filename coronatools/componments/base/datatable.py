@@ -2,14 +2,16 @@
 # @Author: jsgounot
 # @Date:   2020-03-31 14:01:58
 # @Last modified by:   jsgounot
-# @Last Modified time: 2020-04-17 19:17:03
+# @Last Modified time: 2026-10-17 20:09:07
 
+import numpy as np
 import pandas as pd
 
-from bokeh.models import ColumnDataSource, TableColumn, CustomJS
+from bokeh.models import ColumnDataSource, TableColumn, CustomJS, CDSView, IndexFilter
 from bokeh.models import DataTable as BDT
 
 from componments.base.utils import BaseChart
+from componments.base.search import TextIndex
 from componments.base.errors import InternalError
 
 class DataTable(BaseChart) :
@@ -24,16 +26,43 @@ class DataTable(BaseChart) :
     df.df = new_df         # Change
     dt.df["name"] = "Bob"  # No change
     df.make_data_source()  # Change
+
+    With page_size, only the current page (and prefetch rows around it) are sent to the browser,
+    the full frame stays on the server. Search and sorting are done server side, use sort
+    and link_pager instead of the table headers. Selections are kept with the dataframe index.
+
+    Example :
+    dt = DataTable(df=df, page_size=100)
+    dt.link_pager(Spinner(title="Page"))
+    dt.sort("Confirmed", ascending=False)
     """
 
     def __init__(self, * args, columns=[], df=None, dynamic=True, columns_kwargs={}, 
-                 keep_selections=False, ** kwargs) :
+                 keep_selections=False, page_size=None, prefetch=None, ** kwargs) :
         
 
         self._df = pd.DataFrame() if df is None else df
         self._shown_df = None
+        self._source_df = self.df
         self._source = ColumnDataSource() if self.df.empty else ColumnDataSource(self.df)
 
+        # Paging, rows of shown_df in the source (chunk) and the visible ones (filter)
+        self._page_size = page_size
+        self._prefetch = page_size if prefetch is None else prefetch
+        self._page = 0
+        self._chunk = (0, 0)
+        self._pagers = []
+
+        if self.paged :
+            self._filter = IndexFilter(indices=[])
+            kwargs["view"] = CDSView(source=self.source, filters=[self._filter])
+            kwargs.setdefault("sortable", False)
+
+        # Shown rows, search positions (None for all) and sorting (column, ascending)
+        self._positions = None
+        self._sort = None
+        self._orders = {}
+
         columns = columns or self.df.columns
         columns = [TableColumn(field=column, title=column) for column in columns]
         self._dt = BDT(* args, columns=columns, source=self.source, ** kwargs)
@@ -48,8 +77,15 @@ class DataTable(BaseChart) :
         self._selected_indices = set()
         self._name_state = True
 
+        # Search indexes, (column, case_sensitive) : TextIndex, built on first search
+        self._indexes = {}
+
         super().__init__()
 
+        # only the first page is sent
+        if self.paged and not self.df.empty :
+            self.make_data_source()
+
     @property
     def df(self):
         return self._df
@@ -57,16 +93,46 @@ class DataTable(BaseChart) :
     @df.setter
     def df(self, df) :
         self._df = df
+        self._indexes = {}
+        self._orders = {}
         self.make_data_source()
 
     @property
     def shown_df(self) :
+        # Searched and sorted frame, only the current page is in the source when paged
         return self._shown_df
     
     @shown_df.setter
     def shown_df(self, shown_df) :
         self._shown_df = shown_df
-        self.source.data = shown_df
+        if self.paged : self.load_page(self.page, reload=True)
+        else : self.set_source_df(shown_df)
+
+    @property
+    def source_df(self) :
+        # Rows in the source, shown_df or its current chunk
+        return self._source_df
+
+    @property
+    def paged(self) :
+        return self._page_size is not None
+
+    @property
+    def page_size(self):
+        return self._page_size
+
+    @property
+    def npages(self) :
+        if not self.paged or self.shown_df is None : return 1
+        return max(1, -(-len(self.shown_df) // self.page_size))
+
+    @property
+    def page(self) :
+        return self._page
+    
+    @page.setter
+    def page(self, page) :
+        self.load_page(page)
 
     @property
     def dynamic(self):
@@ -111,6 +177,38 @@ class DataTable(BaseChart) :
 
         obj.on_change("value_input", lambda attr, old, new : self.subset(column_name, new))             
 
+    def link_pager(self, obj) :
+        # Link a Spinner with the page number (starting at 1)
+        obj.low, obj.step = 1, 1
+        obj.high, obj.value = self.npages, self.page + 1
+        obj.on_change("value", lambda attr, old, new : self.load_page(new - 1) if new else None)
+        self._pagers.append(obj)
+
+    def set_source_df(self, df) :
+        self._source_df = df
+        self.source.data = df
+        self.restore_selection()
+
+    def load_page(self, page, reload=False) :
+        page = min(max(int(page), 0), self.npages - 1)
+        self._page = page
+
+        start = page * self.page_size
+        stop = min(start + self.page_size, len(self.shown_df))
+        cstart, cstop = self._chunk
+
+        # the source is sent again only if the page is not in the prefetched rows
+        if reload or start < cstart or stop > cstop :
+            cstart = max(0, start - self._prefetch)
+            cstop = min(len(self.shown_df), stop + self._prefetch)
+            self._chunk = (cstart, cstop)
+            self.set_source_df(self.shown_df.iloc[cstart:cstop])
+
+        self._filter.indices = list(range(start - cstart, stop - cstart))
+
+        for obj in self._pagers :
+            obj.high, obj.value = self.npages, page + 1
+
     def make_data_source(self) :
         if self.dynamic :
             ck = self.columns_kwargs
@@ -119,39 +217,70 @@ class DataTable(BaseChart) :
             
             self.dt.columns = columns
 
-        self.shown_df = self.df
-        
+        self._positions = None
+        selected = bool(self.selected_indices)
         if not self.keep_selections :
-            self.source.selected.indices = []
+            self._selected_indices = set()
 
-    def subset(self, colname, search, case_sensitive=False) :
-        serie = self.df[colname]
-        if not case_sensitive :
-            search = search.lower()
-            serie = serie.str.lower()
-
-        if search :
-            df = self.df[serie.str.contains(search)]
+        self.shown_df = self.ordered()
         
-        else :
-            df = self.df
-
-        self.shown_df = df
+        if not self.keep_selections and selected :
+            self.emit_signal("selection", self.selected_rows())
+
+    def sort(self, column=None, ascending=True) :
+        # Server side sorting of shown rows, None for the dataframe order
+        # back to the first page, as for a new search
+        self._sort = None if column is None else (column, ascending)
+        self._page = 0
+        self.shown_df = self.ordered(self._positions)
+
+    def sort_order(self, column, ascending) :
+        # Positions of the dataframe rows sorted by column, computed once
+        key = (column, ascending)
+        if key not in self._orders :
+            serie = self.df[column].reset_index(drop=True)
+            serie = serie.sort_values(ascending=ascending, kind="stable", na_position="last")
+            order = np.empty(len(serie), dtype=int)
+            order[serie.index.to_numpy()] = np.arange(len(serie))
+            self._orders[key] = order
+        return self._orders[key]
+
+    def ordered(self, positions=None) :
+        # Rows at positions (None for all), in the sorting order
+        if self._sort is None :
+            return self.df if positions is None else self.df.iloc[positions]
+
+        order = self.sort_order(* self._sort)
+        positions = np.arange(len(self.df)) if positions is None else positions
+        return self.df.iloc[positions[np.argsort(order[positions], kind="stable")]]
+
+    def search_index(self, colname, case_sensitive=False) :
+        key = (colname, case_sensitive)
+        if key not in self._indexes :
+            self._indexes[key] = TextIndex(self.df[colname], case_sensitive=case_sensitive)
+        return self._indexes[key]
 
-        # we set selected indices
-        shown_idx = list(df.index)
-        select_idx = [idx for idx, main_idx in enumerate(shown_idx) 
-                      if main_idx in self.selected_indices]
+    def subset(self, colname, search, case_sensitive=False) :
+        # search is a plain text, not a regex
+        positions = self.search_index(colname, case_sensitive).search(search)
+        self._positions = None if len(positions) == len(self.df) else positions
 
-        self._trigger_selection = False
-        self.source.selected.indices = select_idx
-        self._trigger_selection = True
+        self._page = 0
+        self.shown_df = self.ordered(self._positions)
 
         # only way I found to trigger callback
         # maybe fix this in another way
         self._name_state = not self._name_state
         self.dt.name = str(self._name_state)
 
+    def restore_selection(self) :
+        # we set selected indices of rows in the source
+        select_idx = np.flatnonzero(self.source_df.index.isin(list(self.selected_indices))).tolist()
+
+        self._trigger_selection = False
+        self.source.selected.indices = select_idx
+        self._trigger_selection = True
+
     def selected_rows(self) :
         return self.df[self.df.index.isin(self.selected_indices)]
 
@@ -159,11 +288,13 @@ class DataTable(BaseChart) :
         if not self.trigger_selection :
             return
 
-        df = self.shown_df
+        df = self.source_df
+        shown = df.iloc[self._filter.indices] if self.paged else df
         df = df.iloc[indices]
 
+        # prefetched rows are not visible, their selection can't change
         selected = set(df.index)
-        unselect = set(self.shown_df.index) - selected
+        unselect = set(shown.index) - selected
 
         self._selected_indices |= selected
         self._selected_indices -= unselect
@@ -2,10 +2,13 @@
 # @Author: jsgounot
 # @Date:   2020-03-28 22:14:45
 # @Last modified by:   jsgounot
-# @Last Modified time: 2020-04-14 17:34:47
+# @Last Modified time: 2026-10-17 19:01:47
 
 class SourceException(Exception) :
 	pass
 
 class InternalError(Exception) :
-	pass
\ No newline at end of file
+	pass
+
+class ReadOnlyError(Exception) :
+	pass
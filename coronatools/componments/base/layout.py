@@ -2,14 +2,28 @@
 # @Author: jsgounot
 # @Date:   2020-04-01 15:34:35
 # @Last modified by:   jsgounot
-# @Last Modified time: 2020-04-03 16:39:45
+# @Last Modified time: 2026-10-17 19:29:42
+
+from contextlib import contextmanager
 
 from componments.base.utils import BokehOverlayModel
 
 class LayoutController(BokehOverlayModel) :
 
+	"""
+	Attributes with on_change functions, called when the attribute is set.
+	In a batch, functions are called once when the block ends (in the order of their first call,
+	with the last attribute and value) and document events are combined.
+
+	Example :
+	with lc.batch() :
+		lc.xname = "Deaths"
+		lc.yname = "Recovered" # shared function called once
+	"""
+
 	def __init__(self, * args, ** kwargs) :
 		self.on_change = {}
+		self._batch = None
 
 		if not all(isinstance(arg, str) for arg in args) :
 			raise ValueError("* args must be a string")
@@ -21,7 +35,37 @@ class LayoutController(BokehOverlayModel) :
 	def __setattr__(self, attr, name) :
 		super().__setattr__(attr, name)
 		for fun in self.on_change.get(attr, []) :
-			fun(attr, name)
+			if self.batching : self._batch[fun] = (attr, name)
+			else : fun(attr, name)
+
+	@property
+	def batching(self) :
+		return self._batch is not None
+
+	@property
+	def document(self) :
+		# document of the layout, events are held during a batch
+		return None
+
+	@contextmanager
+	def batch(self, document=None) :
+		document = document or self.document
+		hold = document is not None and document.callbacks.hold_value is None
+		outer = not self.batching
+
+		if hold : document.hold("combine")
+		if outer : self._batch = {}
+
+		try :
+			yield self
+			if outer :
+				calls, self._batch = self._batch, None
+				for fun, (attr, name) in calls.items() :
+					fun(attr, name)
+
+		finally :
+			if outer : self._batch = None
+			if hold : document.unhold()
 
 	def setup_kwargs(self, kwargs) :
 		for key, value in kwargs.items() :
@@ -2,28 +2,40 @@
 # @Author: jsgounot
 # @Date:   2020-03-16 02:56:21
 # @Last modified by:   jsgounot
-# @Last Modified time: 2020-04-16 17:40:31
+# @Last Modified time: 2026-10-17 19:23:33
 
 from datetime import timedelta
+from itertools import chain, cycle
 
 import pandas as pd
 import numpy as np
 
 from bokeh.plotting import figure
 from bokeh.palettes import Category10_10 as pcolors
-from bokeh.models import HoverTool, ColumnDataSource, Panel, Tabs
+from bokeh.models import HoverTool, ColumnDataSource, Panel, Tabs, Legend, LegendItem, CustomJSTransform
+from bokeh.transform import transform
 
 from componments.base.utils import BaseChart, ToolTips
 from componments.base.errors import SourceException
 
 class MultiLinesPlot(BaseChart) :
 
+    # Data work, done by the master only when plots are shared (see PanelAxisTypes)
+    master_only = ("df", "set_data_source", "add_line", "remove_line")
+
     def __init__(self, * args, tooltips=None, legend_location="top_left", scatter=True, 
-                default_alpha=.8, colors={}, line_source=None, scatter_source=None,
-                kwargs_hovertool={}, kwargs_scatter={}, ** kwargs) :
+                default_alpha=.8, colors={}, line_source=None, scatter_source=None, replace_zero=None,
+                master=None, kwargs_hovertool={}, kwargs_scatter={}, ** kwargs) :
         
+        # master : plot computing the data, this one only draws master sources
+        # replace_zero : value drawn instead of 0 (np.nan for log axis), replaced client side
+        if master is not None :
+            line_source, scatter_source = master._source, getattr(master, "_source_scatter", None)
+
         # Do not try to replace xs and xy, otherwith data_x and data_y will not work anymore
         self._source = line_source or ColumnDataSource(dict(xs=[], ys=[], colors=[], hue=[]))
+        self._replace_zero = replace_zero
+        self._followers = []
 
         default_tooltips = MultiLinesPlot.default_tooltips()
         tooltips = tooltips or default_tooltips
@@ -32,15 +44,20 @@ class MultiLinesPlot(BaseChart) :
         kwargs.setdefault("tools", []).append(hover)
 
         self._figure = figure(* args, ** kwargs)
-        self._figure.multi_line("xs", "ys", source=self._source, line_color='colors', legend_field="hue")
+        ys = MultiLinesPlot.yfield(replace_zero, nested=True)
+        self._renderer = self._figure.multi_line("xs", ys, source=self._source, line_color='colors')
+
+        # One legend item per line, see add_line for spare items
+        self._legend = Legend(items=[])
+        self._figure.add_layout(self._legend)
         
         if scatter :
             kwargs = {"marker" : "circle", "size" : 8, "line_color" : "black"}
             kwargs.update(kwargs_scatter)
             
             self._source_scatter = scatter_source or ColumnDataSource(dict(xs=[], ys=[], fcolors=[], alpha=[]))
-            self._figure.scatter("xs", "ys", source=self._source_scatter, fill_color="fcolors", 
-                                 alpha="alpha", ** kwargs)
+            self._figure.scatter("xs", MultiLinesPlot.yfield(replace_zero), source=self._source_scatter, 
+                                 fill_color="fcolors", alpha="alpha", ** kwargs)
             
             self._default_alpha = default_alpha
 
@@ -49,8 +66,14 @@ class MultiLinesPlot(BaseChart) :
         self._colors = colors
         self.setup(kwargs)
 
+        if master is not None : master.add_follower(self)
+
     def setup(self, kwargs) :
         self._df = pd.DataFrame()
+        self._series = {}
+        self._rows = {}
+        self._dead = 0
+        self.make_legend_items({})
         self._xshift = {}
         self._xshift_format = self.get_shift_format(kwargs.get("x_axis_type", None))
         self._yshift = {}
@@ -64,6 +87,15 @@ class MultiLinesPlot(BaseChart) :
             {"name" : "data_y", "lead" : "$", "description" : "YValue"}
             )
 
+    @staticmethod
+    def yfield(replace_zero=None, nested=False) :
+        if replace_zero is None : return "ys"
+
+        value = "NaN" if np.isnan(replace_zero) else repr(float(replace_zero))
+        fun = f"v == 0 ? {value} : v"
+        v_func = f"return xs.map(line => line.map(v => {fun}))" if nested else f"return xs.map(v => {fun})"
+        return transform("ys", CustomJSTransform(func=f"const v = x; return {fun}", v_func=v_func))
+
     def get_shift_format(self, axis_type=None) :
         fun = lambda x : x
         if axis_type == "datetime" : fun = lambda x : timedelta(x)
@@ -72,11 +104,11 @@ class MultiLinesPlot(BaseChart) :
     # -----------------------------------------------------------------
 
     def __contains__(self, name) :
-        return name in self.data
+        return name in self._rows
 
     @property
     def names(self):
-        return sorted(self.data.keys())
+        return sorted(self._rows)
 
     @property
     def figure(self):
@@ -92,6 +124,9 @@ class MultiLinesPlot(BaseChart) :
 
     @property
     def df(self):
+        # lines added one by one are joined only when the frame is needed
+        if self._df is None :
+            self._df = pd.concat(self._series, axis=1) if self._series else pd.DataFrame()
         return self._df
     
     @df.setter
@@ -110,6 +145,23 @@ class MultiLinesPlot(BaseChart) :
     def yshift(self):
         return self._yshift
 
+    @property
+    def replace_zero(self):
+        return self._replace_zero
+
+    @property
+    def followers(self):
+        return self._followers
+
+    def plots(self) :
+        return [self] + self._followers
+
+    def add_follower(self, plot) :
+        # plot draws the sources of this one, its legend follows this one
+        self._followers.append(plot)
+        rows = {name : row for name, (row, start, stop) in self._rows.items()}
+        plot.make_legend_items(rows, len(self._spares))
+
     @property
     def legend_location(self):
         return self._legend_location
@@ -131,8 +183,14 @@ class MultiLinesPlot(BaseChart) :
         
         self._source.data = data
 
-        if self.legend_location :
-            self.figure.legend.location = self.legend_location
+        sizes = [len(xs) for xs in data.get("xs", [])]
+        starts = np.cumsum([0] + sizes)
+        self._rows = {name : (row, starts[row], starts[row + 1]) for row, name in enumerate(data.get("hue", []))}
+        self._dead = 0
+
+        for plot in self.plots() :
+            plot.make_legend_items({name : row for row, name in enumerate(data.get("hue", []))})
+            if plot.legend_location : plot.figure.legend.location = plot.legend_location
 
         if self._scatter :
             data =  self.make_data_scatter_source(data)
@@ -142,23 +200,25 @@ class MultiLinesPlot(BaseChart) :
     def make_data_source(self, df=None) :
         # multi_line does not work if you only gave a data frame
         # you have to convert it first to dict
+        # all lines share the same x array, y arrays are the frame columns
         if df is None : df = self.df
         self._df = df       
-        
-        data = {"hue" : [], "colors" : [], "xs" : [], "ys" : []}
+        self._series = {column : df[column] for column in df.columns}
         
         # we keep previous colors (if still used in this plot)
         # we update the color reference with color argument
         used_colors = self.get_colors()
         used_colors.update(self.colors)
         used_colors = {column : value for column, value in used_colors.items() if column in df.columns}
-        colors = (color for color in pcolors if color not in set(used_colors.values()))
+        colors = self.free_colors(used_colors.values())
+
+        columns = sorted(df.columns)
+        xs = df.index.to_numpy()
+        ys = np.ascontiguousarray(df[columns].to_numpy(dtype=float).T) if columns else []
 
-        for column in sorted(df.columns) :
-            data["hue"].append(column)
-            data["xs"].append(list(df.index))
-            data["ys"].append(list(df[column]))
+        data = {"hue" : columns, "xs" : [xs] * len(columns), "ys" : list(ys), "colors" : []}
 
+        for column in columns :
             color = used_colors.get(column, None)
             if color is None : color = next(colors)
             data["colors"].append(color)
@@ -167,16 +227,89 @@ class MultiLinesPlot(BaseChart) :
 
     def make_data_scatter_source(self, data) :
         ndata = {"xs" : [], "ys" : [], "fcolors" : [], "alpha": []}
-        if not data : return ndata
+        if not data or not len(data["colors"]) : return ndata
 
-        for idx, color in enumerate(data["colors"]) :
-            ndata["xs"].extend(data["xs"][idx])
-            ndata["ys"].extend(data["ys"][idx])
-            ndata["fcolors"].extend([color] * len(data["xs"][idx]))
-            ndata["alpha"].extend([self.default_alpha] * len(data["xs"][idx]))
+        # one point per line value, lines are flatten one after the other
+        sizes = [len(xs) for xs in data["xs"]]
+        ndata["xs"] = np.concatenate(data["xs"])
+        ndata["ys"] = np.concatenate(data["ys"])
+        ndata["fcolors"] = np.repeat(data["colors"], sizes)
+        ndata["alpha"] = np.full(sum(sizes), self.default_alpha)
 
         return ndata
 
+    def free_colors(self, used) :
+        # palette colors not used yet, then the whole palette again if more lines are needed
+        used = set(used)
+        return chain((color for color in pcolors if color not in used), cycle(pcolors))
+
+    def make_legend_items(self, rows, spares=10) :
+        # rows : line name -> source row
+        # Hidden spare items are used by add_line : a new item would resend the
+        # renderer and all its data with it (references of the new model)
+        self._items = {name : LegendItem(label=name, renderers=[self._renderer], index=row) for name, row in rows.items()}
+        self._spares = [LegendItem(label="", renderers=[self._renderer], visible=False) for idx in range(spares)]
+        self._legend.items = list(self._items.values()) + self._spares
+
+    def show_legend_item(self, name, row) :
+        item = self._items[name] = self._spares.pop()
+        item.update(label=name, index=row, visible=True)
+
+    def hide_legend_item(self, name) :
+        item = self._items.pop(name)
+        item.visible = False
+        self._spares.append(item)
+
+    # -----------------------------------------------------------------
+    # Incremental updates, only the changed line and points are sent to the client
+
+    def add_line(self, name, serie) :
+        # serie : values indexed by x
+        if name in self._rows : self.remove_line(name)
+
+        live = {other : self._source.data["colors"][row] for other, (row, start, stop) in self._rows.items()}
+        color = self.colors.get(name) or self.get_colors().get(name)
+        if color is None or color in live.values() : color = next(self.free_colors(live.values()))
+
+        xs, ys = serie.index.to_numpy(), serie.to_numpy(dtype=float)
+        line = {"hue" : [name], "xs" : [xs], "ys" : [ys], "colors" : [color]}
+        points = self.make_data_scatter_source(line)
+
+        # first line : streaming on empty lists would not keep the arrays types
+        row = len(self._source.data["hue"])
+        start = len(self._source_scatter.data["xs"]) if self._scatter else 0
+        
+        if row : self._source.stream(line)
+        else : self._source.data = line
+
+        if self._scatter :
+            if start : self._source_scatter.stream(points)
+            else : self._source_scatter.data = points
+
+        self._rows[name] = (row, start, start + len(xs))
+        self._series[name] = serie
+        self._df = None
+
+        # no spare legend item left, full update
+        if not self._spares : return self.set_data_source()
+
+        for plot in self.plots() : plot.show_legend_item(name, row)
+
+    def remove_line(self, name) :
+        # The line row is emptied and its points hidden, data are compacted when
+        # hidden points outnumber visible ones
+        row, start, stop = self._rows.pop(name)
+        self._series.pop(name)
+        self._df = None
+
+        self._source.patch({"xs" : [(row, [])], "ys" : [(row, [])]})
+        if self._scatter : self._source_scatter.patch({"ys" : [(slice(start, stop), np.full(stop - start, np.nan))]})
+        for plot in self.plots() : plot.hide_legend_item(name)
+
+        self._dead += stop - start
+        if self._dead > sum(stop - start for row, start, stop in self._rows.values()) :
+            self.set_data_source()
+
     def get_colors(self) :
         data = self._source.data
         names = data.get("hue", [])
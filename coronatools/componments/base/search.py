@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 19:24:49
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 19:24:49
+
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+class TextIndex() :
+
+    """
+    Substring search (search as you type) on a text column.
+    Values are lowered once and each n-gram maps to the sorted positions of the values containing it.
+    A query is checked only on the values having all its n-grams. When a query extends the
+    previous one (user typing), only the previous result is checked.
+
+    Example :
+    index = TextIndex(df["Location"])
+    positions = index.search("fra") # array([61])
+    df.iloc[positions]
+    """
+
+    def __init__(self, values, case_sensitive=False, ngram=3) :
+        values = pd.Series(values).fillna("").astype(str)
+        if not case_sensitive : values = values.str.lower()
+
+        self._values = values.to_numpy(dtype=object)
+        self._case_sensitive = case_sensitive
+        self._ngram = ngram
+        self._postings = TextIndex.make_postings(self._values, ngram)
+        self._all = np.arange(len(self._values))
+        self._last = ("", self._all)
+
+    def __len__(self) :
+        return len(self._values)
+
+    @staticmethod
+    def make_postings(values, ngram) :
+        postings = defaultdict(list)
+        for position, value in enumerate(values) :
+            for gram in {value[idx:idx + ngram] for idx in range(len(value) - ngram + 1)} :
+                postings[gram].append(position)
+        return {gram : np.array(positions) for gram, positions in postings.items()}
+
+    def candidates(self, query) :
+        last_query, last_result = self._last
+        if last_query and last_query in query : return last_result
+        if len(query) < self._ngram : return self._all
+
+        grams = {query[idx:idx + self._ngram] for idx in range(len(query) - self._ngram + 1)}
+        postings = sorted((self._postings.get(gram, self._all[:0]) for gram in grams), key=len)
+
+        result = postings[0]
+        for positions in postings[1:] :
+            if not len(result) : break
+            result = np.intersect1d(result, positions, assume_unique=True)
+        return result
+
+    def search(self, query) :
+        # Sorted positions of the values containing query
+        if not self._case_sensitive : query = query.lower()
+        if not query : return self._all
+
+        candidates = self.candidates(query)
+        found = np.fromiter((query in value for value in self._values[candidates]), dtype=bool, count=len(candidates))
+        result = candidates[found]
+
+        self._last = (query, result)
+        return result
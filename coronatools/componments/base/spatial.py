@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 19:05:44
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 19:40:42
+
+import numpy as np
+
+from shapely.geometry import Point
+from shapely.strtree import STRtree
+
+class SpatialIndex() :
+
+    """
+    Point in polygon lookup using a R-tree on geometries bounding boxes.
+    A query is a bounding box probe followed by exact tests on the few candidates only.
+
+    Example :
+    index = SpatialIndex(gdf["geometry"], gdf["Country"])
+    index.query(lon, lat) # ["France"]
+    """
+
+    def __init__(self, geometries, keys) :
+        items = [(geometry, key) for geometry, key in zip(geometries, keys)
+                 if geometry is not None and not geometry.is_empty]
+
+        self._geometries = [geometry for geometry, key in items]
+        self._keys = [key for geometry, key in items]
+        self._tree = STRtree(self._geometries)
+
+        # shapely < 2 returns geometries instead of indices
+        self._positions = {id(geometry) : idx for idx, geometry in enumerate(self._geometries)}
+
+    def __len__(self) :
+        return len(self._keys)
+
+    def candidates(self, point) :
+        result = self._tree.query(point)
+        if len(result) and not isinstance(result[0], (int, np.integer)) :
+            return [self._positions[id(geometry)] for geometry in result]
+        return result
+
+    def query(self, x, y) :
+        point = Point(x, y)
+        return [self._keys[idx] for idx in self.candidates(point)
+                if self._geometries[idx].contains(point)]
+
+
+class PatchLevels() :
+
+    """
+    Patches coordinates of the same geometries at several levels of detail, from the coarsest to the finest.
+    Visible patches of a viewport are found with their bounding boxes, and the finest level
+    where they have at most maxpoints coordinates is used for them.
+
+    Example :
+    levels = PatchLevels([coarse, fine]) # patches dictionnaries, see WMap.geometry_to_patches
+    positions, level = levels.viewport((x0, x1, y0, y1), maxpoints=20000)
+    xs, ys = levels.patches(level, positions)
+    """
+
+    def __init__(self, levels) :
+        self._levels = [(list(level["xs"]), list(level["ys"])) for level in levels]
+        self._sizes = np.array([[len(x) for x in xs] for xs, ys in self._levels]).reshape(len(self._levels), -1)
+
+        # bounding boxes (xmin, xmax, ymin, ymax) of the finest level
+        xs, ys = self._levels[-1]
+        bounds = [(np.nanmin(x), np.nanmax(x), np.nanmin(y), np.nanmax(y)) for x, y in zip(xs, ys)]
+        self._bounds = np.array(bounds, dtype=float).reshape(-1, 4)
+
+    def __len__(self) :
+        return self._sizes.shape[1]
+
+    @property
+    def nlevels(self):
+        return len(self._levels)
+
+    def sizes(self, level) :
+        # Number of coordinates of each patch
+        return self._sizes[level]
+
+    def visible(self, bounds) :
+        # Positions of the patches intersecting bounds (x0, x1, y0, y1)
+        x0, x1, y0, y1 = bounds
+        xmin, xmax, ymin, ymax = self._bounds.T
+        return np.flatnonzero((xmin <= x1) & (xmax >= x0) & (ymin <= y1) & (ymax >= y0))
+
+    def level(self, positions, maxpoints) :
+        # Finest level where patches at positions fit in maxpoints coordinates, the coarsest otherwise
+        fitting = np.flatnonzero(self._sizes[:, positions].sum(axis=1) <= maxpoints)
+        return int(fitting[-1]) if len(fitting) else 0
+
+    def viewport(self, bounds, maxpoints) :
+        positions = self.visible(bounds)
+        return positions, self.level(positions, maxpoints)
+
+    def changed(self, positions, shown, level) :
+        # Positions where the patch at level differs from the one at its shown level
+        xs = self._levels[level][0]
+        same = lambda idx : xs[idx] is self._levels[shown[idx]][0][idx] or (
+            self._sizes[level, idx] == self._sizes[shown[idx], idx] and np.array_equal(xs[idx], self._levels[shown[idx]][0][idx], equal_nan=True))
+        return np.array([idx for idx in positions if not same(idx)], dtype=int)
+
+    def patches(self, level, positions) :
+        xs, ys = self._levels[level]
+        return [xs[idx] for idx in positions], [ys[idx] for idx in positions]
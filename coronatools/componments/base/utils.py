@@ -2,11 +2,29 @@
 # @Author: jsgounot
 # @Date:   2020-03-25 23:42:46
 # @Last modified by:   jsgounot
-# @Last Modified time: 2020-04-15 13:32:51
+# @Last Modified time: 2026-10-17 19:28:26
+
+import time
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 
 import logging
 logger = logging.getLogger("coronatools")
 
+# Shared by all sessions of the process, see executor
+_EXECUTOR = None
+
+def executor() :
+    global _EXECUTOR
+    if _EXECUTOR is None :
+        _EXECUTOR = ThreadPoolExecutor(thread_name_prefix="coronatools")
+    return _EXECUTOR
+
+def set_executor(pool) :
+    # Any concurrent.futures executor, computed functions must be picklable for a process pool
+    global _EXECUTOR
+    _EXECUTOR = pool
+
 class SignalControl() :
 
     def __init__(self) :
@@ -19,18 +37,164 @@ class SignalControl() :
     def add_receiver(self, signal, fun) :
         self.signals_funs.setdefault(signal, []).append(fun)
 
+class Binding() :
+
+    """
+    Apply widget values received with on_change to a function, with an optional coalescing mode :
+    None : each value is applied when received
+    latest : values are applied on the next tick of the server loop, only the latest one
+    throttle : at most one value each interval (ms), the first one directly and the latest one at the end
+    debounce : the latest value, once no value was received during interval (ms)
+
+    Values which are replaced by a newer one before being applied are counted as skipped.
+    Outside a server session (no event loop), values are always applied when received.
+    """
+
+    modes = (None, "latest", "throttle", "debounce")
+
+    def __init__(self, fun, mode=None, interval=100) :
+        if mode not in Binding.modes :
+            raise ValueError(f"Unknown coalescing mode : {mode} (must be one of {Binding.modes})")
+
+        self.fun = fun
+        self.mode = mode
+        self.interval = interval
+
+        self.received = 0
+        self.applied = 0
+        self.skipped = 0
+
+        self._pending = None
+        self._has_pending = False
+        self._scheduled = None
+        self._last = None
+
+    def __call__(self, document, value) :
+        self.received += 1
+
+        if self.mode is None or document is None or document.session_context is None :
+            return self.apply(value)
+
+        if self._has_pending :
+            self.skipped += 1
+            logger.debug(f"Skip value {self._pending} for {self.fun}")
+
+        self._pending, self._has_pending = value, True
+
+        if self.mode == "latest" :
+            if self._scheduled is None :
+                self._scheduled = document.add_next_tick_callback(self.flush)
+
+        elif self.mode == "throttle" :
+            if self._scheduled is not None : return
+            wait = 0 if self._last is None else self.interval - (time.monotonic() - self._last) * 1000
+            if wait <= 0 : self.flush()
+            else : self._scheduled = document.add_timeout_callback(self.flush, wait)
+
+        elif self.mode == "debounce" :
+            if self._scheduled is not None : document.remove_timeout_callback(self._scheduled)
+            self._scheduled = document.add_timeout_callback(self.flush, self.interval)
+
+    def flush(self) :
+        self._scheduled = None
+        if not self._has_pending : return
+
+        value = self._pending
+        self._pending, self._has_pending = None, False
+        self.apply(value)
+
+    def apply(self, value) :
+        self._last = time.monotonic()
+        self.applied += 1
+        self.fun(value)
+
+class BackgroundUpdate() :
+
+    """
+    Compute data out of the server loop and apply the result to the document.
+    compute runs in the executor, apply is called with its result on the next tick of the
+    document loop (the only safe way to modify a document from another thread).
+    Only the result of the latest request is applied, older ones are cancelled or discarded.
+    Outside a server session (no event loop), compute and apply are called directly.
+
+    Example :
+    update = BackgroundUpdate(lambda df : setattr(chart, "df", df))
+    update.submit(chart.figure.document, pgcd.data_from_day, day)
+    """
+
+    def __init__(self, apply) :
+        self.apply = apply
+
+        self.requested = 0
+        self.applied = 0
+        self.discarded = 0
+
+        self._future = None
+
+    def submit(self, document, compute, * args, ** kwargs) :
+        self.requested += 1
+        ticket = self.requested
+
+        if document is None or document.session_context is None :
+            return self.done(ticket, compute(* args, ** kwargs))
+
+        if self._future is not None and self._future.cancel() :
+            self.discarded += 1
+
+        future = self._future = executor().submit(compute, * args, ** kwargs)
+        future.add_done_callback(lambda future : self.schedule(document, ticket, future))
+
+    def schedule(self, document, ticket, future) :
+        if future.cancelled() : return
+        document.add_next_tick_callback(partial(self.finish, ticket, future))
+
+    def finish(self, ticket, future) :
+        if ticket != self.requested :
+            self.discarded += 1
+            return
+
+        self._future = None
+        try : result = future.result()
+        except Exception :
+            logger.exception("Background update failed")
+            return
+
+        self.done(ticket, result)
+
+    def done(self, ticket, result) :
+        self.applied += 1
+        self.apply(result)
+
 class BokehOverlayModel(SignalControl) :
 
     def __init__(self) :
         super().__init__()
 
-    def link_on_change(self, self_attr, select, select_attr="value", postfun=None) :
-        def on_change(attr, old, new) :
+    @property
+    def bindings(self) :
+        # self_attr : [Binding], created here since some charts do not call __init__
+        try : return self._bindings
+        except AttributeError :
+            self._bindings = {}
+            return self._bindings
+
+    @property
+    def skipped_updates(self) :
+        return {self_attr : sum(binding.skipped for binding in bindings)
+                for self_attr, bindings in self.bindings.items()}
+
+    def link_on_change(self, self_attr, select, select_attr="value", postfun=None, coalesce=None, interval=100) :
+        # coalesce : None, latest, throttle or debounce, see Binding
+        def set_value(new) :
             logger.debug(f"Get {new} to attr {self_attr} for {self}")
             if postfun : new = postfun(new)
             logger.debug(f"Set {new} to attr {self_attr} for {self}")
             setattr(self, self_attr, new)
-        select.on_change(select_attr, on_change)
+
+        binding = Binding(set_value, coalesce, interval)
+        self.bindings.setdefault(self_attr, []).append(binding)
+        select.on_change(select_attr, lambda attr, old, new : binding(select.document, new))
+        return binding
 
     def link_to_controller(self, self_attr, controller, controller_attr, postfun=None) :
         def on_change(new) :
@@ -51,6 +215,22 @@ class BaseChart(BokehOverlayModel) :
     @property
     def figure(self):
         raise NotImplementedError()
+
+    @property
+    def updates(self) :
+        # name : BackgroundUpdate, created here since some charts do not call __init__
+        try : return self._updates
+        except AttributeError :
+            self._updates = {}
+            return self._updates
+
+    def submit_update(self, name, apply, compute, * args, ** kwargs) :
+        # Run compute(* args, ** kwargs) off the server loop, see BackgroundUpdate
+        # requests with the same name replace each other
+        if name not in self.updates : self.updates[name] = BackgroundUpdate(apply)
+        update = self.updates[name]
+        update.apply = apply
+        update.submit(self.figure.document, compute, * args, ** kwargs)
     
     @property
     def xname(self) :
@@ -2,29 +2,86 @@
 # @Author: jsgounot
 # @Date:   2020-03-25 23:11:15
 # @Last modified by:   jsgounot
-# @Last Modified time: 2020-04-01 02:59:15
+# @Last Modified time: 2026-10-17 19:52:41
+
+import numpy as np
 
 from bokeh.plotting import figure
-from bokeh.models import GeoJSONDataSource, HoverTool
+from bokeh.models import GeoJSONDataSource, ColumnDataSource, HoverTool
+from bokeh.models import CustomJS, LabelSet, Toggle
 from bokeh.models.mappers import LogColorMapper, LinearColorMapper
 from bokeh.palettes import YlOrRd9 as cpalette
 from bokeh.events import DoubleTap
 
-from componments.base.utils import BaseChart
+from componments.base.utils import BaseChart, Binding
+
+# Client side playback, see WMap.make_player
+# frames.data.values : values of the color field for each day (days x patches, row major)
+# frames.tags : [field, first day in ms], the server is only called when playback stops
+# Only the color field is played, hover tooltips keep the values of the day playback started from
+PLAYER_CODE = """
+const field = renderer.glyph.fill_color.field
+const ready = frames.tags.length == 2 && frames.tags[0] == field && frames.data.values.length > 0
+
+if (!toggle.active || !ready) {
+    if (toggle._timer != null) {
+        clearInterval(toggle._timer)
+        toggle._timer = null
+        label.data.text[0] = ""
+        label.change.emit()
+        slider.value = toggle._day
+    }
+    return
+}
+
+if (toggle._timer != null) return
+
+const values = frames.data.values
+const start = frames.tags[1]
+const size = source.data[field].length
+const ndays = Math.floor(values.length / size)
+const oneday = 86400000
+
+let idx = Math.round((slider.value - start) / oneday)
+if (idx >= ndays - 1 || idx < 0) idx = -1
+
+toggle._day = slider.value
+toggle._timer = setInterval(function() {
+    idx += 1
+    if (idx >= ndays) {
+        toggle.active = false
+        return
+    }
+
+    // local change only, source.data itself is not reassigned so nothing is sent to the server
+    const offset = idx * size
+    source.data[field] = values.subarray ? values.subarray(offset, offset + size) : values.slice(offset, offset + size)
+    source.change.emit()
+
+    toggle._day = start + idx * oneday
+    label.data.text[0] = new Date(toggle._day).toISOString().slice(0, 10)
+    label.change.emit()
+}, 1000 / fps)
+"""
 
 COLOR_MAPPER_NAME = {
     "Log" : "Log scale color mapping",
-    "Linear" : "Linear scale color mapping"
+    "Linear" : "Linear scale color mapping",
+    "Quantile" : "Quantile color mapping"
 }
 
 class WMap(BaseChart) :
 
     mappers = {
         "Log" : LogColorMapper,
-        "Linear" : LinearColorMapper
+        "Linear" : LinearColorMapper,
+        "Quantile" : LogColorMapper
     }
 
-    def __init__(self, geojson, field, mapper, * args, tooltips=None, kwargs_hovertool={}, ** kwargs) :
+    def __init__(self, data, field, mapper, * args, tooltips=None, kwargs_hovertool={}, ** kwargs) :
+        # data can be either a geojson string or a dictionnary with patches xs and ys (see geometry_to_patches)
+        # with a dictionnary, only modified columns are sent to the client when the data source change
+
         super().__init__()
         self._mapper = mapper
         self._field = field       
@@ -33,7 +90,8 @@ class WMap(BaseChart) :
             hover = HoverTool(tooltips=tooltips.bokeh_format(), ** kwargs_hovertool)
             kwargs.setdefault("tools", []).append(hover)
 
-        self._source = GeoJSONDataSource(geojson=geojson)
+        if isinstance(data, dict) : self._source = ColumnDataSource(data=data)
+        else : self._source = GeoJSONDataSource(geojson=data)
 
         self._figure = figure(* args, ** kwargs)       
         self._patches = self.figure.patches('xs','ys', source=self.source, 
@@ -80,13 +138,120 @@ class WMap(BaseChart) :
         self.update_patch()
 
     @staticmethod
-    def build_mapper(name, low, high, palette=None, ** kwargs) :
+    def build_mapper(name, low, high, palette=None, quantiles=None, ** kwargs) :
+        # Quantile : quantiles are the len(palette) + 1 bins edges
         palette = palette or cpalette[::-1]
+        if name == "Quantile" : palette = WMap.quantile_palette(quantiles, low, high, palette)
         return WMap.mappers[name](low=low, high=high, palette=palette, ** kwargs)
 
+    @staticmethod
+    def quantile_palette(quantiles, low, high, palette, size=256) :
+        # Palette of a log mapper from low to high, each color spans one quantile bin
+        edges = np.geomspace(low, high, size + 1)
+        centers = np.sqrt(edges[:-1] * edges[1:])
+        bins = np.searchsorted(quantiles[1:-1], centers, side="right")
+        return [palette[idx] for idx in np.clip(bins, 0, len(palette) - 1)]
+
+    @staticmethod
+    def geometry_to_patches(geometries) :
+        # Shapely (multi)polygons to patches coordinates
+        # Multipolygons are drawn as one patch, parts separated with NaN (as GeoJSONDataSource does)
+        xs, ys = [], []
+        for geometry in geometries :
+            polygons = getattr(geometry, "geoms", [geometry])
+            pxs, pys = [], []
+            for polygon in polygons :
+                x, y = polygon.exterior.coords.xy
+                if pxs :
+                    pxs.append([np.nan])
+                    pys.append([np.nan])
+                pxs.append(x)
+                pys.append(y)
+
+            xs.append(np.concatenate(pxs))
+            ys.append(np.concatenate(pys))
+
+        return {"xs" : xs, "ys" : ys}
+
+    @property
+    def static_geometry(self):
+        return not isinstance(self.source, GeoJSONDataSource)
+
     def set_data_source(self, data) :
-        if not data : raise ValuError("No data source to provide")
-        self.source.geojson = data
+        if not data : raise ValueError("No data source to provide")
+
+        if self.static_geometry :
+            # geometry columns are not resent, only the given ones
+            self.source.data.update(data)
+        else :
+            self.source.geojson = data
+
+    def make_player(self, slider, fps=10, ** kwargs) :
+        # Toggle playing all days client side at fps, slider is synced when playback stops
+        # Only for static geometry, frames are sent when playback starts (see load_frames)
+        # While playing, tooltips show the other fields of the starting day, they follow when playback stops
+        if not self.static_geometry : raise ValueError("Playback requires static geometry")
+
+        self._frames = ColumnDataSource(data={"values" : []})
+        self._label = ColumnDataSource(data={"x" : [10], "y" : [10], "text" : [""]})
+        self.figure.add_layout(LabelSet(x="x", y="y", text="text", source=self._label, 
+            x_units="screen", y_units="screen", text_font_size="20px"))
+
+        kwargs.setdefault("label", "Play")
+        toggle = Toggle(** kwargs)
+
+        args = dict(toggle=toggle, frames=self._frames, source=self.source, renderer=self.patches,
+                    slider=slider, label=self._label, fps=fps)
+        callback = CustomJS(args=args, code=PLAYER_CODE)
+        toggle.js_on_change("active", callback)
+        self._frames.js_on_change("data", callback)
+
+        toggle.on_change("active", lambda attr, old, new : self.load_frames() if new else None)
+        return toggle
+
+    def set_frames(self, field, firstday, values) :
+        # values : days x patches matrix, firstday : date of the first row
+        if not hasattr(self, "_frames") : return
+        start = int(np.datetime64(firstday, "D").astype(np.int64)) * 86400000
+        self._frames.tags = [field, start]
+        self._frames.data = {"values" : np.ravel(values).astype(np.float32)}
+
+    def load_frames(self) :
+        raise NotImplementedError
+
+    def link_viewport(self, maxpoints=10000, coalesce="debounce", interval=250) :
+        # Finer patches for the visible extent when x or y range change, see set_viewport
+        # Only for static geometry, maxpoints caps the coordinates of visible patches
+        if not self.static_geometry : raise ValueError("Levels of detail require static geometry")
+
+        self._maxpoints = maxpoints
+        self._shown_levels = np.zeros(len(self.source.data["xs"]), dtype=int)
+
+        # a pan or a zoom changes up to 4 values, they are coalesced into one viewport
+        binding = Binding(lambda value : self.set_viewport(self.viewport()), coalesce, interval)
+        self.bindings.setdefault("viewport", []).append(binding)
+
+        callback = lambda attr, old, new : binding(self.figure.document, new)
+        for frange in (self.figure.x_range, self.figure.y_range) :
+            frange.on_change("start", callback)
+            frange.on_change("end", callback)
+
+        return binding
+
+    def viewport(self) :
+        # (x0, x1, y0, y1), None before the client has set the ranges
+        bounds = (self.figure.x_range.start, self.figure.x_range.end, self.figure.y_range.start, self.figure.y_range.end)
+        if any(value is None for value in bounds) : return None
+        return tuple(float(value) for value in bounds)
+
+    def set_viewport(self, bounds) :
+        raise NotImplementedError
+
+    def patch_geometry(self, positions, xs, ys) :
+        # only coordinates of the given patches are sent (ColumnDataSource.patch)
+        if not len(positions) : return
+        positions = [int(idx) for idx in positions]
+        self.source.patch({"xs" : list(zip(positions, xs)), "ys" : list(zip(positions, ys))})
 
     def update_patch(self) :
         self.patches.glyph.fill_color = {'field' : self.field, 
@@ -2,17 +2,21 @@
 # @Author: jsgounot
 # @Date:   2020-03-28 22:19:49
 # @Last modified by:   jsgounot
-# @Last Modified time: 2020-04-01 01:03:00
+# @Last Modified time: 2026-10-17 20:02:47
 
 import logging
 logger = logging.getLogger("coronatools")
 
 from datetime import datetime
 
+import numpy as np
+import pandas as pd
+
 from bokeh.models import ColumnDataSource
 
 from componments.base.utils import ToolTips, ToolTip
 from componments.base.bar import DynamicBarPlot as BDBP
+from dataset import geocache
 
 import layouts.utils as lutils
 
@@ -32,6 +36,9 @@ class DynamicBarPlot(BDBP) :
         data_source = {column : [] for column in self.pgcd_columns()}
         super().__init__(columnx, columny, ndisplay, * args, width=.8, tooltips=tooltips, data_source=data_source, ** kwargs)      
 
+        # (geocolumn, column, lastday) of the frames sent for scrubbing
+        self._frames_key = None
+
     @property
     def pgcd(self):
         return self._pgcd
@@ -63,15 +70,86 @@ class DynamicBarPlot(BDBP) :
         self._date = date
         self.update()
 
+    @property
+    def ndisplay(self):
+        return self._ndisplay
+
+    @ndisplay.setter
+    def ndisplay(self, ndisplay) :
+        # only ndisplay rows are fetched
+        # up to topk bars, the browser already drew them from the frames (see link_scrubber)
+        self._ndisplay = ndisplay
+        if not self.scrubbing or ndisplay > self.topk : self.update()
+
     def pgcd_columns(self) :
         return [column for column in lutils.ACOLS if column not in ("Date", )]
 
     def update(self) :
         logger.debug("Launch update DBR")
-        df = self.pgcd.data_from_day(day=self.date, report=False, fill=False, geocolumn=self.geocolumn)
+        self.submit_update("update", self.apply_update, self.make_df, self.geocolumn, self.column, self.date, self.ndisplay)
+        if self.scrubbing : self.load_frames()
+
+    def load_frames(self) :
+        # Frames are computed once per geocolumn, column and data update, out of the server loop
+        key = (self.geocolumn, self.column, self.pgcd.lastday())
+        if key == self._frames_key : return
+
+        self._frames_key = key
+        self.clear_frames()
+        self.submit_update("frames", lambda frames : self.set_frames(* frames), 
+                           self.make_frames, self.geocolumn, self.column, self.topk)
+
+    def make_frames(self, geocolumn, column, topk) :
+        # topk sorted bars of each day, see DynamicBarPlot.set_frames
+        days = geocache.days_range(self.pgcd.firstday(), self.pgcd.lastday())
+        names = [str(name) for name in self.pgcd.unique(geocolumn)]
+        columns = ["YValue"] + self.pgcd_columns()
+
+        # precomputed ranks (see dataset.cube), gather of the topk rows of all days
+        rank_table = getattr(self.pgcd, "rank_table", None)
+        if rank_table is not None :
+            table = rank_table(column, topk, geocolumn=geocolumn)
+            table["YValue"] = table[column]
+            frames = {fcol : self.frame_values(table[fcol]) for fcol in columns}
+            frames["Location"] = table[geocolumn].astype(np.int32)
+            return days[0], names, frames
+
+        codes = np.full((len(days), topk), -1, dtype=np.int32)
+        frames = {}
+
+        for idx, day in enumerate(days) :
+            df = self.make_df(geocolumn, column, day, topk)
+            codes[idx, :len(df)] = pd.Categorical(df["Location"].astype(str), categories=names).codes
+            for fcol in columns :
+                values = self.frame_values(df[fcol].to_numpy())
+                if fcol not in frames : frames[fcol] = np.zeros((len(days), topk), dtype=values.dtype)
+                frames[fcol][idx, :len(df)] = values
+
+        frames["Location"] = codes
+        return days[0], names, frames
+
+    @staticmethod
+    def frame_values(values) :
+        # counts are kept exact (int32), other values as float32
+        return values.astype(np.int32 if np.issubdtype(values.dtype, np.integer) else np.float32)
+
+    def make_df(self, geocolumn, column, date, n=None) :
+        # n first locations sorted by column, out of the server loop (see BaseChart.submit_update)
+        # with precomputed ranks (see dataset.cube), only these n rows are gathered
+        top_from_day = getattr(self.pgcd, "top_from_day", None)
+
+        if top_from_day is not None :
+            df = top_from_day(column, n=n, day=date, geocolumn=geocolumn)
+        else :
+            df = self.pgcd.data_from_day(day=date, report=False, fill=False, geocolumn=geocolumn)
+            df = df.sort_values(column, ascending=False)
+            if n is not None : df = df.head(n)
+
         logger.debug("Fetched results")
-        df.columns = [{self.geocolumn : "Location"}.get(column, column) for column in df.columns]
-        df = df.sort_values(self.column, ascending=False)
-        df["YValue"] = df[self.column] 
+        df.columns = [{geocolumn : "Location"}.get(dfcol, dfcol) for dfcol in df.columns]
+        df["YValue"] = df[column] 
         logger.debug("Cleaned results")     
+        return df
+
+    def apply_update(self, df) :
         self.df = df
\ No newline at end of file
@@ -2,7 +2,7 @@
 # @Author: jsgounot
 # @Date:   2020-03-29 03:29:44
 # @Last modified by:   jsgounot
-# @Last Modified time: 2020-04-17 19:16:58
+# @Last Modified time: 2026-10-17 19:29:42
 
 import numpy as np
 import pandas as pd
@@ -15,6 +15,8 @@ import layouts.utils as lutils
 
 class MultiLinesPlotScatter(MLP) :
 
+    master_only = MLP.master_only + ("gcol", "xcol", "ycol", "change_locations", "serie", "update", "set_columns")
+
     def __init__(self, pgcd, * args, gcol=None,
         xcol=None, ycol=None, replace_zero=None, ** kwargs) :
         
@@ -23,9 +25,11 @@ class MultiLinesPlotScatter(MLP) :
         self._xcol = xcol
         self._ycol = ycol
 
-        super().__init__(* args, ** kwargs)
+        # location : serie, for the current gcol, xcol and ycol
+        self._cache = {}
+
+        super().__init__(* args, replace_zero=replace_zero, ** kwargs)
         self.ignore = True
-        self._replace_zero = replace_zero
 
     @property
     def pgcd(self):
@@ -58,28 +62,34 @@ class MultiLinesPlotScatter(MLP) :
         self._ycol = ycol
         self.update()
 
-    @property
-    def replace_zero(self):
-        return self._replace_zero
-    
+    def set_columns(self, gcol=None, xcol=None, ycol=None) :
+        # Several columns with one update, lines are removed if gcol changes
+        new_gcol = gcol is not None and gcol != self._gcol
+        if gcol is not None : self._gcol = gcol
+        if xcol is not None : self._xcol = xcol
+        if ycol is not None : self._ycol = ycol
+        self.update(locations=[] if new_gcol else None)
 
     def change_locations(self, locations) :
-        tokeep = set(self.df.columns) & set(locations)
-        toadd = set(locations) - set(self.df.columns)
+        # Only added and removed locations are sent to the client
+        locations = set(locations)
+
+        for location in set(self.names) - locations :
+            self.remove_line(location)
 
-        df = self.df
-        df = df[tokeep].reset_index()
-        for location in toadd :
-            sdf = self.data_from_location(location)           
+        for location in sorted(locations - set(self.names)) :
+            self.add_line(location, self.serie(location))
 
-            if df.empty :
-                df = sdf
-            else :
-                df = df.merge(sdf, on=self.xcol, how="outer")
+    def serie(self, location) :
+        serie = self._cache.get(location)
+        if serie is None :
+            df = self.data_from_location(location, setindex=True)
+            serie = self._cache[location] = self.clean(df)[location]
+        return serie
 
-        df = df.set_index(self.xcol)
-        if self.replace_zero : df = df.replace(0, self.replace_zero)
-        self.df = df
+    def clean(self, df) :
+        # zero values are replaced client side (see replace_zero)
+        return df.fillna(0)
 
     def data_from_location(self, location, setindex=False) :
         df = self.pgcd.data_from_geocol(location, self.gcol, fill=True, as_datetime=True)
@@ -95,15 +105,31 @@ class MultiLinesPlotScatter(MLP) :
         return df
 
     def update(self, locations=None) :
-        locations = list(self.df.columns) if locations is None else locations
-        
+        # Data or columns changed, all lines are computed again (out of the server loop)
+        locations = self.names if locations is None else locations
+        dropped = set(self.names) - set(locations)
+        self._cache = {}
+
+        apply = lambda df : self.apply_update(df, dropped)
+        self.submit_update("update", apply, self.make_df, locations)
+
+    def make_df(self, locations) :
+        if not locations : return pd.DataFrame()
+        df = pd.concat([self.data_from_location(location, setindex=True)
+            for location in locations], axis=1)
+        return self.clean(df)
+
+    def apply_update(self, df, dropped=()) :
+        # lines may have been added or removed while df was computed
+        self._cache.update({location : df[location] for location in df.columns})
+        locations = [location for location in self.names if location not in dropped]
+
         if locations :
-            df = pd.concat([self.data_from_location(location, setindex=True)
-                for location in locations], axis=1)
+            df = pd.concat([self.serie(location) for location in locations], axis=1)
         else :
-            df = pd.DataFrame()     
+            df = pd.DataFrame()
 
-        try : self.df = df.fillna(0)
+        try : self.df = df
         except SourceException : pass
 
 class MultiLinesPlotMapping(MLP) :
@@ -2,20 +2,20 @@
 # @Author: jsgounot
 # @Date:   2020-03-30 01:48:52
 # @Last modified by:   jsgounot
-# @Last Modified time: 2020-04-01 01:45:22
+# @Last Modified time: 2026-10-17 19:52:41
 
-import json
-from functools import lru_cache
-
-from shapely.geometry import Point
+import numpy as np
 
 from componments.base.wmap import WMap as BWMap
 from componments.base.utils import ToolTip
+from dataset import geocache, stats
 
 class WMap(BWMap) :
 
-    def __init__(self, pgcd, date, field, mkind="Log", tooltips=None, * args, ** kwargs) :
-        # Low resolution map, to change if light=False in jdata_day function
+    def __init__(self, pgcd, date, field, mkind="Log", tooltips=None, * args, static_geometry=False, ** kwargs) :
+        # With static_geometry, patches are sent once and only values are updated on date change
+        # Low resolution map, finer patches are sent for the visible extent with link_viewport
+        # GeoJSON mode (not static) stays on the low resolution map, see light=True in geocache.day_geojson
         self._gdf = pgcd.load_gdf(default_detail=110)[["Country", "geometry"]]
 
         # pgcd attributes
@@ -27,12 +27,13 @@ class WMap(BWMap) :
         tooltips.insert(0, ToolTip("Country", "Country"))
  
         # we make the mapper
-        low = pgcd.cdf[field].min()
-        high = pgcd.cdf[field].max()
-        mapper = BWMap.build_mapper(mkind, low, high)
+        mapper = self.make_mapper(field, mkind)
+
+        data = self.cdata_geometry() if static_geometry else self.jdata()
+        super().__init__(data, field, mapper, * args, tooltips=tooltips, ** kwargs)
 
-        geojson = self.jdata()
-        super().__init__(geojson, field, mapper, * args, tooltips=tooltips, ** kwargs)
+        # (field, lastday) of the frames sent for playback
+        self._frames_key = None
 
     @property
     def pgcd(self):
@@ -52,6 +53,15 @@ class WMap(BWMap) :
     	self.set_data_source()
     	self._figure.title.text = 'Coronavirus map : Day ' + str(date)
 
+    @property
+    def field(self):
+        return self._field
+
+    @field.setter
+    def field(self, field) :
+        self._field = field
+        self.set_mapper()
+
     @property
     def mkind(self):
     	return self._mkind
@@ -61,34 +71,100 @@ class WMap(BWMap) :
     	self._mkind = mkind
     	self.set_mapper()
 
-    @lru_cache(maxsize=50)
     def jdata_day(self, date) :
-        # Lower lru cache maxsize for memory reduction
+        # Shared between sessions and stored on disk, see dataset.geocache
+        return geocache.get_geojson(self.pgcd, date)
 
-        df = self.pgcd.data_from_day(self.date, report=False, fill=True)
-        df = self.pgcd.df2gdf(df, "Country", light=True)
-        df = df[df["geometry"] != None]
+    def jdata(self) :
+        return self.jdata_day(self.date)
 
-        # clean data
-        df = df[df["Country"] != "Antarctica"]
-        df = df.drop("RepDays", axis=1)
-        df["Date"] = df["Date"].astype(str)
+    def cdata_day(self, date, countries=None) :
+        # Values of one day, aligned on the static patches
+        if countries is None : countries = self.source.data["Country"]
+        df = self.pgcd.data_from_day(date, report=False, fill=True)
+        df = df.drop_duplicates("Country").set_index("Country").reindex(countries)
 
-        jdata = json.loads(df.to_json())
-        return json.dumps(jdata)
+        columns = [column for column in df.select_dtypes("number").columns if column != "RepDays"]
+        data = {column : df[column].to_numpy() for column in columns}
+        data["Date"] = [str(date)] * len(df)
+        return data
 
-    def jdata(self) :
-        return self.jdata_day(self.date)
+    def cdata(self) :
+        return self.cdata_day(self.date)
+
+    def cdata_geometry(self) :
+        # Patches (computed once per process, see dataset.geocache) with values of the current day
+        patches = geocache.shared_patches(self.pgcd, default_detail=110)
+        # coordinates lists are copied, they are patched for this session only (see set_viewport)
+        geometry = {"xs" : list(patches["xs"]), "ys" : list(patches["ys"]), "Country" : patches["Country"]}
+        return {** geometry, ** self.cdata_day(self.date, patches["Country"])}
 
     def set_data_source(self) :
-        super().set_data_source(self.jdata())
+        # data are computed out of the server loop, see BaseChart.submit_update
+        if self.static_geometry :
+            countries = self.source.data["Country"]
+            self.submit_update("data", super().set_data_source, self.cdata_day, self.date, countries)
+        else :
+            self.submit_update("data", super().set_data_source, self.jdata_day, self.date)
+
+    def set_viewport(self, bounds) :
+        # Levels are chosen out of the server loop, only changed patches are sent
+        if bounds is None : return
+        apply = lambda result : self.apply_geometry(* result)
+        self.submit_update("geometry", apply, self.make_geometry, bounds, self._shown_levels.copy())
+
+    def make_geometry(self, bounds, shown) :
+        # Visible patches at the finest level fitting in maxpoints coordinates
+        # Patches with the same coordinates at this level are not sent again, hidden ones are left as they are
+        levels = geocache.shared_levels(self.pgcd)
+        visible, level = levels.viewport(bounds, self._maxpoints)
+        positions = levels.changed(visible, shown, level)
+        xs, ys = levels.patches(level, positions)
+        return level, visible, positions, xs, ys
+
+    def apply_geometry(self, level, visible, positions, xs, ys) :
+        self._shown_levels[visible] = level
+        self.patch_geometry(positions, xs, ys)
+
+    def make_frames(self, field, countries) :
+        # Values of field for all days, days x countries
+        days = geocache.days_range(self.pgcd.firstday(), self.pgcd.lastday())
+
+        # one slice of the cube (see dataset.cube), otherwise one data_from_day per day
+        metric_table = getattr(self.pgcd, "metric_table", None)
+        if metric_table is not None :
+            return field, days[0], metric_table(field, countries).astype(np.float32)
+
+        values = np.empty((len(days), len(countries)), dtype=np.float32)
+
+        for idx, day in enumerate(days) :
+            df = self.pgcd.data_from_day(day, report=False, fill=True)
+            values[idx] = df.drop_duplicates("Country").set_index("Country")[field].reindex(countries)
+
+        return field, days[0], values
+
+    def load_frames(self) :
+        # Frames are computed once per field and data update, out of the server loop
+        key = (self.field, self.pgcd.lastday())
+        if key == self._frames_key : return
+
+        self._frames_key = key
+        countries = self.source.data["Country"]
+        self.submit_update("frames", lambda frames : self.set_frames(* frames), self.make_frames, self.field, countries)
+
+    def reset_frames(self) :
+        self._frames_key = None
+
+    def make_mapper(self, field, mkind) :
+        # bounds of all days from the statistics catalog, positive min for log scales
+        fstats = stats.stats(self.pgcd, field)
+        low = fstats.min if mkind == "Linear" else fstats.posmin
+        if not np.isfinite(low) : low = 1
+        return WMap.build_mapper(mkind, low, max(fstats.max, low), quantiles=fstats.quantiles)
 
     def set_mapper(self) :
-        low = self.pgcd.cdf[self.field].min()
-        high = self.pgcd.cdf[self.field].max()
-        self.mapper = WMap.build_mapper(self.mkind, low, high)
+        self.mapper = self.make_mapper(self.field, self.mkind)
 
     def doubletap(self, event) :
-        point = Point(event.x, event.y)
-        gdf = self.gdf[self.gdf["geometry"].apply(lambda polygone : polygone.contains(point))]
-        if len(gdf) == 1 : self.emit_signal("doubletap", list(gdf["Country"])[0])
\ No newline at end of file
+        countries = geocache.shared_index(self.pgcd, default_detail=110).query(event.x, event.y)
+        if len(countries) == 1 : self.emit_signal("doubletap", countries[0])
\ No newline at end of file
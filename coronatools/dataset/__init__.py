@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 19:01:47
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 19:01:47
+
@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 19:09:42
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 20:08:46
+
+"""
+Dense in-memory backend for PGC data queries.
+
+Values are stored in a numpy array of shape (dates, locations, metrics), with integer
+indexes for each axis. A day is a view on cube[day], a location serie a view on
+cube[:, location], there is no boolean mask over all rows of the long dataframe.
+
+One cube is materialized for each geographic level (Country, SubRegion, REGION_WB, Continent)
+when data are loaded. Counts are summed from countries, rates and per capita values are
+computed again from the sums (see RATIOS), so a continent query costs the same as a country one.
+
+Query methods keep the PersistantGeoCoronaData signatures, so componments can use
+either one. Anything else (geometries ...) is read from the fallback object.
+
+fill=True semantic : days without data for a location take the last known values
+(0 before the first report), daily counts of these days are 0.
+fill=False semantic : only locations with data this day are given, a group (continent ...)
+sums the countries with data this day only, PopSize included (level.reported).
+report=True semantic : days are given as report day numbers (RepDays) instead of dates.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+import logging
+logger = logging.getLogger("coronatools")
+
+DAILY_METRICS = ("CODay", "DEDay", "REDay")
+
+# metric : (numerator columns, denominator columns, factor), computed on summed values
+RATIOS = {
+    "LRate" : (("Deaths",), ("Deaths", "Recovered"), 1),
+    "PrcCont" : (("Confirmed", "Deaths", "Recovered"), ("PopSize",), 1),
+    "CO10K" : (("Confirmed",), ("PopSize",), 1e4),
+    "DE10K" : (("Deaths",), ("PopSize",), 1e4),
+    "RE10K" : (("Recovered",), ("PopSize",), 1e4),
+    "AC10K" : (("Active",), ("PopSize",), 1e4)
+}
+
+# reported and reported_attributes (days x locations) : values of the fill=False semantic,
+# the same than cube and attributes for countries
+GeoLevel = namedtuple("GeoLevel", ["locations", "lindex", "cube", "present", "attributes", "reported", "reported_attributes"])
+
+class CubeCoronaData() :
+
+    queries = ("firstday", "lastday", "unique", "data_from_day", "data_from_geocol", "top_from_day", "rank_table", "metric_table", "statistics")
+
+    def __init__(self, cdf, fallback=None, geocolumn="Country", static=("ADM0_A3", "SubRegion", "REGION_WB", "Continent", "PopSize"),
+                 levels=("SubRegion", "REGION_WB", "Continent")) :
+
+        self._fallback = fallback
+        self._geocolumn = geocolumn
+        self._columns = list(cdf.columns)
+
+        as_dates = lambda values : pd.to_datetime(values.astype(str)).values.astype("datetime64[D]")
+        self._dates, didx = CubeCoronaData.factorize(cdf["Date"], as_dates)
+        self._pydates = np.array(self._dates.astype(object))
+        self._dindex = {date : idx for idx, date in enumerate(self.days())}
+
+        ulocations, lidx = CubeCoronaData.factorize(cdf[geocolumn], lambda values : values.astype(str))
+
+        # report day number of the first date
+        self._report_shift = int(np.asarray(cdf["RepDays"])[0]) - int(didx[0]) if "RepDays" in cdf.columns else 0
+
+        # static attributes, one value per location
+        static = [column for column in static if column in cdf.columns]
+        first = np.unique(lidx, return_index=True)[1]
+        attributes = {column : np.asarray(cdf[column].iloc[first]) for column in static}
+
+        excluded = set(static) | {geocolumn, "Date", "RepDays"}
+        self._metrics = [column for column in self._columns if column not in excluded]
+        self._mindex = {metric : idx for idx, metric in enumerate(self._metrics)}
+        self._integers = [metric for metric in self._metrics if pd.api.types.is_integer_dtype(cdf[metric])]
+
+        shape = (len(self._dates), len(ulocations), len(self._metrics))
+        logger.debug(f"Build data cube of shape {shape}")
+
+        cube = np.full(shape, np.nan)
+        cube[didx, lidx] = np.column_stack([np.asarray(cdf[metric], dtype=float) for metric in self._metrics])
+
+        present = np.zeros(shape[:2], dtype=bool)
+        present[didx, lidx] = True
+
+        cube = CubeCoronaData.fill_cube(cube, present, self._metrics)
+        country = CubeCoronaData.make_level(ulocations, cube, present, attributes)
+        self._levels = {geocolumn : country}
+
+        # (geocolumn, metric) : (locations sorted by metric for each day, present locations per day)
+        self._ranks = {}
+        self._statistics = None
+
+        for level in levels :
+            if level in attributes :
+                self._levels[level] = self.aggregate(country, level)
+
+    @staticmethod
+    def factorize(values, fun) :
+        # Sorted unique values (converted with fun) and the index of each row in them
+        # categorical columns are converted and sorted once per category
+        if not isinstance(values.dtype, pd.CategoricalDtype) :
+            return np.unique(fun(np.asarray(values)), return_inverse=True)
+
+        uniques, inverse = np.unique(fun(np.asarray(values.cat.categories)), return_inverse=True)
+        rows = inverse[values.cat.codes.to_numpy()]
+
+        # unused categories are removed
+        used = np.bincount(rows, minlength=len(uniques)) > 0
+        return uniques[used], (np.cumsum(used) - 1)[rows]
+
+    @staticmethod
+    def make_level(locations, cube, present, attributes, reported=None, reported_attributes=None) :
+        lindex = {location : idx for idx, location in enumerate(locations)}
+        reported = cube if reported is None else reported
+        return GeoLevel(locations, lindex, cube, present, attributes, reported, reported_attributes or {})
+
+    @staticmethod
+    def fill_cube(cube, present, metrics) :
+        # forward fill along dates, 0 before first report and for daily counts
+        didx = np.where(present, np.arange(cube.shape[0])[:, None], 0)
+        np.maximum.accumulate(didx, axis=0, out=didx)
+        cube = cube[didx, np.arange(cube.shape[1])[None, :]]
+
+        seen = np.logical_or.accumulate(present, axis=0)
+        cube[~seen] = 0
+
+        daily = [idx for idx, metric in enumerate(metrics) if metric in DAILY_METRICS]
+        if daily :
+            missing = ~present
+            for idx in daily :
+                cube[:, :, idx][missing] = 0
+
+        return np.nan_to_num(cube, copy=False)
+
+    def aggregate(self, country, level) :
+        # Sum countries of each group with a membership matrix (countries x groups)
+        groups = country.attributes[level].astype(str)
+        locations, gidx = np.unique(groups, return_inverse=True)
+
+        membership = np.zeros((len(groups), len(locations)))
+        membership[np.arange(len(groups)), gidx] = 1
+
+        cube = np.einsum("dlm,lg->dgm", country.cube, membership, optimize=True)
+        cpresent = country.present.astype(float)
+        present = (cpresent @ membership) > 0
+
+        # fill=False, only countries with data each day : filled values (after a first report,
+        # on days without data) are removed from the sums, they are only a few cells
+        reported = cube.copy()
+        filled = ~ country.present & np.logical_or.accumulate(country.present, axis=0)
+        days, lidx = np.nonzero(filled)
+        np.subtract.at(reported, (days, gidx[lidx]), country.cube[days, lidx])
+
+        attributes, reported_attributes = {}, {}
+        popsize = rpopsize = None
+        if "PopSize" in country.attributes :
+            cpopsize = country.attributes["PopSize"].astype(float)
+            popsize, rpopsize = cpopsize @ membership, (cpresent * cpopsize) @ membership
+            attributes["PopSize"] = popsize.astype(np.int64)
+            reported_attributes["PopSize"] = rpopsize.astype(np.int64)
+
+        self.compute_ratios(cube, popsize)
+        self.compute_ratios(reported, rpopsize)
+        return CubeCoronaData.make_level(locations, cube, present, attributes, reported, reported_attributes)
+
+    def compute_ratios(self, cube, popsize) :
+        # Inplace, ratios of summed values, 0 when the denominator is null
+        # popsize of each location, or of each day and location
+        if popsize is not None : popsize = np.atleast_2d(popsize)
+
+        def values(columns) :
+            return sum(popsize if column == "PopSize" else cube[:, :, self._mindex[column]]
+                       for column in columns)
+
+        for metric, (numerator, denominator, factor) in RATIOS.items() :
+            if metric not in self._mindex : continue
+            if popsize is None and "PopSize" in denominator : continue
+            if any(column not in self._mindex for column in numerator + denominator if column != "PopSize") : continue
+
+            num, den = values(numerator), values(denominator)
+            with np.errstate(divide="ignore", invalid="ignore") :
+                ratio = np.where(den > 0, num / den, 0) * factor
+
+            cube[:, :, self._mindex[metric]] = ratio
+
+    def __getattr__(self, name) :
+        if self._fallback is None :
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        return getattr(self._fallback, name)
+
+    @property
+    def metrics(self):
+        return self._metrics
+
+    @property
+    def levels(self):
+        return list(self._levels)
+
+    def level(self, geocolumn=None) :
+        return self._levels[geocolumn or self._geocolumn]
+
+    @property
+    def cube(self):
+        return self.level().cube
+
+    @property
+    def locations(self):
+        return self.level().locations
+
+    def days(self) :
+        return [date.item() for date in self._dates]
+
+    def values(self, level, column, fill=True) :
+        # Values of column for all days and locations of level, static attributes broadcasted
+        if column in self._mindex :
+            return (level.cube if fill else level.reported)[:, :, self._mindex[column]]
+        if not fill and column in level.reported_attributes :
+            return level.reported_attributes[column]
+        return np.broadcast_to(level.attributes[column], level.present.shape)
+
+    def rank_index(self, metric, geocolumn=None) :
+        # Locations of each day sorted by decreasing metric (fill=False), absent ones last, computed once
+        geocolumn = geocolumn or self._geocolumn
+        key = (geocolumn, metric)
+
+        if key not in self._ranks :
+            # static attributes (PopSize ...) give the same order each day
+            level = self.level(geocolumn)
+            attribute = level.attributes.get(metric)
+            if metric not in self._mindex and (attribute is None or not np.issubdtype(attribute.dtype, np.number)) :
+                raise KeyError(f"Can not rank {geocolumn} by {metric} : not a metric or a numeric attribute")
+
+            values = np.where(level.present, self.values(level, metric, fill=False), -np.inf)
+            order = np.argsort(-values, axis=1, kind="stable").astype(np.int32)
+            self._ranks[key] = (order, level.present.sum(axis=1))
+
+        return self._ranks[key]
+
+    def statistics(self) :
+        # Statistics catalog of this data (see dataset.stats)
+        if self._statistics is None :
+            from dataset.stats import StatsCatalog
+            self._statistics = StatsCatalog(self)
+        return self._statistics
+
+    def day_index(self, day, report=False) :
+        if day is None : return len(self._dates) - 1
+        if report :
+            # negative indexes would silently wrap around
+            idx = int(day) - self._report_shift
+            if not 0 <= idx < len(self._dates) : raise KeyError(f"Day not found in data : {day}")
+            return idx
+        if hasattr(day, "date") : day = day.date()
+        try : return self._dindex[day]
+        except KeyError : raise KeyError(f"Day not found in data : {day}")
+
+    def report_day(self, idx) :
+        return idx + self._report_shift
+
+    # -----------------------------------------------------------------
+    # PersistantGeoCoronaData interface
+
+    def firstday(self, report=False) :
+        return self.report_day(0) if report else self._dates[0].item()
+
+    def lastday(self, report=False) :
+        idx = len(self._dates) - 1
+        return self.report_day(idx) if report else self._dates[idx].item()
+
+    def unique(self, column) :
+        if column in self._levels : return list(self._levels[column].locations)
+        attributes = self.level().attributes
+        if column in attributes : return sorted(set(attributes[column]))
+        return self._fallback.unique(column)
+
+    def data_from_day(self, day=None, report=False, fill=False, geocolumn="Country") :
+        if geocolumn not in self._levels :
+            return self._fallback.data_from_day(day=day, report=report, fill=fill, geocolumn=geocolumn)
+
+        level = self._levels[geocolumn]
+        idx = self.day_index(day, report)
+        rows = slice(None) if fill else level.present[idx]
+        return self.day_frame(level, idx, rows, geocolumn, fill)
+
+    def top_from_day(self, column, n=None, day=None, report=False, geocolumn="Country") :
+        # data_from_day (fill=False) of the n locations with the highest column, sorted
+        if geocolumn not in self._levels :
+            df = self.data_from_day(day=day, report=report, fill=False, geocolumn=geocolumn)
+            df = df.sort_values(column, ascending=False)
+            return df if n is None else df.head(n)
+
+        idx = self.day_index(day, report)
+        order, counts = self.rank_index(column, geocolumn)
+        count = counts[idx] if n is None else min(n, counts[idx])
+        return self.day_frame(self._levels[geocolumn], idx, order[idx, :count], geocolumn, fill=False)
+
+    def rank_table(self, column, n, geocolumn="Country") :
+        # The n locations with the highest column for all days, as (days x n) arrays
+        # location codes (index in unique(geocolumn), -1 after the last present one) and metric values
+        order, counts = self.rank_index(column, geocolumn)
+        level = self.level(geocolumn)
+
+        # padded with 0 when n is higher than the number of locations
+        pad = ((0, 0), (0, max(0, n - order.shape[1])))
+        codes = order[:, :n]
+        days = np.arange(len(codes))[:, None]
+
+        table = {metric : level.reported[days, codes, midx] for metric, midx in self._mindex.items()}
+        table.update({metric : table[metric].astype(np.int64) for metric in self._integers})
+        table.update({name : self.values(level, name, fill=False)[days, codes] for name, values in level.attributes.items()
+                      if np.issubdtype(values.dtype, np.number)})
+        table = {name : np.pad(values, pad) for name, values in table.items()}
+
+        table[geocolumn] = np.where(np.arange(n)[None, :] < counts[:, None], np.pad(codes, pad), -1)
+        return table
+
+    def metric_table(self, column, locations=None, geocolumn="Country") :
+        # Values of column for all days as a (days x locations) array, the ones of data_from_day with fill=True
+        # columns are ordered as locations (unique(geocolumn) when None), NaN for unknown locations
+        level = self.level(geocolumn)
+        values = self.values(level, column)
+        if locations is None : return values
+
+        lidx = np.array([level.lindex.get(location, -1) for location in locations], dtype=int)
+        table = values[:, np.maximum(lidx, 0)].astype(float)
+        table[:, lidx < 0] = np.nan
+        return table
+
+    def day_frame(self, level, idx, rows, geocolumn, fill=True) :
+        values = (level.cube if fill else level.reported)[idx]
+        data = {geocolumn : level.locations[rows]}
+        data.update({column : self.values(level, column, fill)[idx, rows] for column in level.attributes})
+        data["Date"] = self._dates[idx].item()
+        data["RepDays"] = self.report_day(idx)
+        data.update({metric : values[rows, midx] for metric, midx in self._mindex.items()})
+
+        return self.make_frame(data, geocolumn)
+
+    def data_from_geocol(self, location, geocolumn, fill=True, as_datetime=False) :
+        if geocolumn not in self._levels :
+            return self._fallback.data_from_geocol(location, geocolumn, fill=fill, as_datetime=as_datetime)
+
+        level = self._levels[geocolumn]
+        lidx = level.lindex.get(location)
+        if lidx is None : return pd.DataFrame(columns=self.frame_columns(geocolumn))
+
+        values = (level.cube if fill else level.reported)[:, lidx]
+        rows = slice(None) if fill else level.present[:, lidx]
+
+        data = {geocolumn : location}
+        data.update({column : self.values(level, column, fill)[rows, lidx] for column in level.attributes})
+        data["Date"] = self._dates[rows].astype("datetime64[ns]") if as_datetime else self._pydates[rows]
+        data["RepDays"] = np.arange(len(self._dates))[rows] + self._report_shift
+        data.update({metric : values[rows, midx] for metric, midx in self._mindex.items()})
+
+        return self.make_frame(data, geocolumn)
+
+    def frame_columns(self, geocolumn) :
+        if geocolumn == self._geocolumn : return self._columns
+        return [geocolumn] + [column for column in self._columns if column in self._levels[geocolumn].attributes
+                              or column in ("Date", "RepDays") or column in self._mindex]
+
+    def make_frame(self, data, geocolumn) :
+        # columns are ordered and typed before the frame creation, much faster than after
+        for metric in self._integers :
+            data[metric] = data[metric].astype(np.int64)
+        return pd.DataFrame({column : data[column] for column in self.frame_columns(geocolumn)})
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 19:03:18
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 20:05:33
+
+"""
+Daily GeoJSON of the worldmap, shared by every session and worker.
+
+Entries are keyed by (dataset version, day). A day is computed on its first request
+(worldmap without static_geometry), then kept on disk, one file per day, and only the last
+used ones are kept in memory (bounded LRU).
+
+data.csv.geojson/
+    <version>/2020-03-01.json
+    <version>/2020-03-02.json
+    ...
+"""
+
+import os
+import shutil
+import threading
+import weakref
+from datetime import timedelta
+from collections import OrderedDict
+
+import numpy as np
+
+import logging
+logger = logging.getLogger("coronatools")
+
+from componments.base.wmap import WMap as BWMap
+from componments.base.spatial import SpatialIndex, PatchLevels
+from dataset import refresh
+
+# Worldmap levels of detail : the light map patches (shared_patches), then the detailed map
+# simplified with these tolerances (degrees), 0 for the detailed map itself
+LEVELS_DETAIL = 50
+LEVELS_TOLERANCES = (0.1, 0.02, 0)
+
+def cache_dir(fname) :
+    return fname + ".geojson"
+
+def day_geojson(pgcd, day) :
+    # Worldmap geojson for one day, low resolution map (light=True)
+    df = pgcd.data_from_day(day, report=False, fill=True)
+    df = pgcd.df2gdf(df, "Country", light=True)
+    df = df[df["geometry"] != None]
+
+    # clean data
+    df = df[df["Country"] != "Antarctica"]
+    df = df.drop("RepDays", axis=1)
+    df["Date"] = df["Date"].astype(str)
+
+    # to_json already returns a valid json string
+    return df.to_json()
+
+class GeoJSONCache() :
+
+    def __init__(self, dirname=None, version=None, maxsize=50) :
+        self._dirname = dirname
+        self._version = version
+        self._maxsize = maxsize
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        return self._version
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    @property
+    def ondisk(self):
+        return self._dirname is not None and self._version is not None
+
+    def day_fname(self, day) :
+        return os.path.join(self._dirname, str(self._version), str(day) + ".json")
+
+    def remember(self, day, jdata) :
+        with self._lock :
+            self._memory[day] = jdata
+            self._memory.move_to_end(day)
+            while len(self._memory) > self.maxsize :
+                self._memory.popitem(last=False)
+
+    def read(self, day) :
+        with self._lock :
+            jdata = self._memory.get(day)
+            if jdata is not None :
+                self._memory.move_to_end(day)
+                return jdata
+
+        if self.ondisk and os.path.isfile(self.day_fname(day)) :
+            with open(self.day_fname(day)) as f :
+                jdata = f.read()
+            self.remember(day, jdata)
+            return jdata
+
+        return None
+
+    def write(self, day, jdata) :
+        if self.ondisk :
+            fname = self.day_fname(day)
+            os.makedirs(os.path.dirname(fname), exist_ok=True)
+            refresh.atomic_write(fname, lambda f : f.write(jdata))
+
+        self.remember(day, jdata)
+
+    def get(self, pgcd, day) :
+        jdata = self.read(day)
+        if jdata is None :
+            logger.debug(f"GeoJSON cache miss for day {day} (version {self.version})")
+            jdata = day_geojson(pgcd, day)
+            self.write(day, jdata)
+        return jdata
+
+    def clean(self) :
+        # Remove other versions from disk
+        if not self.ondisk or not os.path.isdir(self._dirname) : return
+        for name in os.listdir(self._dirname) :
+            if name != str(self.version) :
+                shutil.rmtree(os.path.join(self._dirname, name), ignore_errors=True)
+
+# ---------------------------------------------------------------------------
+
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+def shared_cache(pgcd) :
+    # One cache per dataset version, shared by all sessions of the process
+    # Without version (data not loaded from a file), entries are only kept in memory
+    version = getattr(pgcd, "version", None)
+    fname = getattr(pgcd, "fname", None)
+
+    # Only the current version of a file is kept, entries of a previous one are dropped
+    # when the new one is first used (see server.reload), memory ones with their data
+    key = (fname, version) if version else ("memory", id(pgcd))
+    with _CACHES_LOCK :
+        cache = _CACHES.get(key)
+        if cache is None :
+            dirname = cache_dir(fname) if fname and version else None
+            cache = _CACHES[key] = GeoJSONCache(dirname, version)
+
+            if version :
+                for old in [other for other in _CACHES if other[0] == fname and other != key] :
+                    del _CACHES[old]
+            else :
+                weakref.finalize(pgcd, _CACHES.pop, key, None)
+
+    return cache
+
+def get_geojson(pgcd, day) :
+    return shared_cache(pgcd).get(pgcd, day)
+
+class SharedGeometry() :
+
+    # One object computed from a geometry set, with its own lock (see shared_geometry)
+    # the geometry set is not kept alive by the entry, which is dropped with it
+
+    def __init__(self, key, gdf) :
+        self.ref = weakref.ref(gdf)
+        self.value = None
+        self.lock = threading.Lock()
+        weakref.finalize(gdf, _GEOMETRIES.pop, key, None)
+
+_GEOMETRIES = {}
+
+def shared_geometry(pgcd, name, fun, ** kwargs) :
+    # Object computed once per geometry set (load_gdf results are shared by the snapshot)
+    # fun runs under the lock of this key only, the other geometries and caches stay available
+    # (detailed levels can take seconds to build while sessions are opened)
+    gdf = pgcd.load_gdf(** kwargs)
+    key = (name, id(gdf))
+
+    with _CACHES_LOCK :
+        entry = _GEOMETRIES.get(key)
+        if entry is None or entry.ref() is not gdf :
+            entry = _GEOMETRIES[key] = SharedGeometry(key, gdf)
+
+    with entry.lock :
+        if entry.value is None :
+            entry.value = fun(gdf)
+
+    return entry.value
+
+def make_patches(gdf) :
+    gdf = gdf[gdf["geometry"].notna() & (gdf["Country"] != "Antarctica")]
+    patches = BWMap.geometry_to_patches(gdf["geometry"])
+    patches["Country"] = list(gdf["Country"])
+    return patches
+
+def shared_patches(pgcd, ** kwargs) :
+    # Patches coordinates of the worldmap, same rows than day_geojson
+    return shared_geometry(pgcd, "patches", make_patches, ** kwargs)
+
+def make_levels(gdf, base, tolerances=LEVELS_TOLERANCES) :
+    # Levels aligned on the base patches rows, a country missing from gdf keeps the previous level patch
+    geometries = gdf.drop_duplicates("Country").set_index("Country")["geometry"].reindex(base["Country"])
+    levels = [base]
+
+    for tolerance in tolerances :
+        simplified = geometries.simplify(tolerance, preserve_topology=True) if tolerance else geometries
+        valid = (simplified.notna() & ~ simplified.is_empty).to_numpy()
+        patches = BWMap.geometry_to_patches(simplified[valid])
+
+        xs, ys = list(levels[-1]["xs"]), list(levels[-1]["ys"])
+        for idx, x, y in zip(np.flatnonzero(valid), patches["xs"], patches["ys"]) :
+            xs[idx], ys[idx] = x, y
+        levels.append({"xs" : xs, "ys" : ys})
+
+    return PatchLevels(levels)
+
+def shared_levels(pgcd, detail=LEVELS_DETAIL, tolerances=LEVELS_TOLERANCES) :
+    # Patches of the worldmap at several levels of detail, same rows than shared_patches
+    base = shared_patches(pgcd, default_detail=110)
+    fun = lambda gdf : make_levels(gdf, base, tolerances)
+    return shared_geometry(pgcd, ("levels", tolerances), fun, default_detail=detail)
+
+def shared_index(pgcd, ** kwargs) :
+    # Spatial index of countries, used for doubletap
+    fun = lambda gdf : SpatialIndex(gdf["geometry"], gdf["Country"])
+    return shared_geometry(pgcd, "index", fun, ** kwargs)
+
+# ---------------------------------------------------------------------------
+
+def days_range(firstday, lastday) :
+    return [firstday + timedelta(days=idx) for idx in range((lastday - firstday).days + 1)]
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 19:06:51
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 20:06:18
+
+"""
+Save of the data csv file after a refresh.
+
+The new content is the refreshed frame sorted by (Country, Date), the order of pgcd files,
+so rows removed upstream are removed from the file too. It is written only when it differs
+from the file, next to the old one and renamed : a running server never reads a half written
+file. Rows are not appended, a new day adds one row per country in the middle of the file.
+
+Each effective change increments the dataset version (data.csv.version), used
+as key by the caches (see dataset.geocache).
+"""
+
+import os
+import json
+import stat
+import hashlib
+import tempfile
+from datetime import datetime
+
+import logging
+logger = logging.getLogger("coronatools")
+
+KEYS = ["Country", "Date"]
+
+def version_fname(fname) :
+    return fname + ".version"
+
+def read_version(fname) :
+    # Current dataset version, None if never recorded
+    path = version_fname(fname)
+    if not os.path.isfile(path) : return None
+    with open(path) as f :
+        return json.load(f)["version"]
+
+def content_sha1(fname, chunk_size=1 << 20) :
+    sha1 = hashlib.sha1()
+    with open(fname, "rb") as f :
+        for chunk in iter(lambda : f.read(chunk_size), b"") :
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+def dataset_version(fname) :
+    # Version of the data file, files never saved with update_data are identified by their content
+    return read_version(fname) or content_sha1(fname)
+
+def bump_version(fname) :
+    version = (read_version(fname) or 0) + 1
+    content = {"version" : version, "updated" : datetime.now().isoformat(timespec="seconds")}
+    atomic_write(version_fname(fname), lambda f : json.dump(content, f))
+    return version
+
+def read_umask() :
+    # os.umask can only be read by changing it
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+# read once, changing the umask is not thread safe
+UMASK = read_umask()
+
+def file_mode(fname) :
+    # Mode of the existing file, or the default one (umask) for a new file
+    if os.path.exists(fname) : return stat.S_IMODE(os.stat(fname).st_mode)
+    return 0o666 & ~ UMASK
+
+def atomic_write(fname, fun, mode="w") :
+    # fun receives the opened temporary file
+    # mkstemp files are private (0600), the final file gets the mode of file_mode
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(fname)), suffix=".tmp")
+    try :
+        with os.fdopen(fd, mode) as f :
+            fun(f)
+        os.chmod(tmp, file_mode(fname))
+        os.replace(tmp, fname)
+    except :
+        os.remove(tmp)
+        raise
+
+def save(fname, df, keys=KEYS) :
+    # Save df sorted by keys, only if the csv content changed
+    # Return True when the file was written (and the version incremented)
+    # Content is compared as text, no per row diff : the comparison costs less than the csv
+    # conversion itself (a frame parsed back from the file with rounded floats is a change)
+    content = df.sort_values(keys, kind="stable").to_csv(index=False)
+
+    if os.path.isfile(fname) :
+        with open(fname) as f :
+            if f.read() == content :
+                logger.debug("Data unchanged, file kept")
+                return False
+
+    atomic_write(fname, lambda f : f.write(content))
+    bump_version(fname)
+    return True
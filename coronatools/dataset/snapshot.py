@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 19:01:47
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 20:04:58
+
+import os
+import threading
+
+import logging
+logger = logging.getLogger("coronatools")
+
+from componments.base.errors import ReadOnlyError
+from dataset import refresh
+from dataset.cube import CubeCoronaData
+
+class DatasetSnapshot() :
+
+    """
+    Read only view of a PersistantGeoCoronaData instance, shared by all sessions of a server process.
+
+    Immutability contract :
+    - The snapshot itself cannot be modified (no attribute assignment, no update / save)
+    - Frames returned by the query methods (data_from_day, data_from_geocol ...) are new objects
+      and can be modified by the caller
+    - Shared frames (cdf, gdf and load_gdf results) are the same objects for every session
+      and must never be modified inplace, make a copy first (df = df.copy())
+      This is not enforced : cdf and gdf are the pgcd frames themselves, not read only views,
+      an inplace change is not detected and is seen by every session
+
+    Example :
+    snapshot = get_snapshot(fname)
+    df = snapshot.data_from_day(fill=True)  # Ok, this is your own frame
+    df = snapshot.cdf[["Country", "Date"]]  # Ok, column selection returns a new frame
+    snapshot.cdf["Date"] = None             # Forbidden, every sessions would see it
+    """
+
+    blocked = ("update", "save")
+    backends = {"pgcd" : None, "cube" : CubeCoronaData}
+
+    def __init__(self, pgcd, fname=None, frame=None, version=None, backend=None) :
+        # backend (optional) answers the data queries instead of pgcd (see dataset.cube)
+        object.__setattr__(self, "_pgcd", pgcd)
+        object.__setattr__(self, "_backend", backend)
+        object.__setattr__(self, "_fname", fname)
+        object.__setattr__(self, "_frame", frame)
+        object.__setattr__(self, "_version", version)
+        object.__setattr__(self, "_gdf_cache", {})
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    @staticmethod
+    def from_file(fname, head=0, backend="pgcd") :
+        # pgcd always parses the csv, the backend is built on its frame so only one copy is kept
+        from pycoronadata import PersistantGeoCoronaData
+        pgcd = PersistantGeoCoronaData(fname=fname, head=head)
+        if head : return DatasetSnapshot(pgcd, fname)
+
+        version = refresh.dataset_version(fname)
+
+        backend = DatasetSnapshot.backends[backend]
+        if backend is not None : backend = backend(pgcd.cdf, pgcd)
+
+        return DatasetSnapshot(pgcd, fname, version=version, backend=backend)
+
+    def __getattr__(self, name) :
+        if name in DatasetSnapshot.blocked :
+            raise ReadOnlyError(f"'{name}' cannot be called on a shared snapshot")
+        if self._backend is not None and name in self._backend.queries :
+            return getattr(self._backend, name)
+        return getattr(self._pgcd, name)
+
+    def __setattr__(self, name, value) :
+        raise ReadOnlyError(f"Cannot set '{name}', snapshot is shared across sessions")
+
+    def __delattr__(self, name) :
+        raise ReadOnlyError(f"Cannot delete '{name}', snapshot is shared across sessions")
+
+    @property
+    def fname(self):
+        return self._fname
+
+    @property
+    def version(self):
+        # Dataset version (see dataset.refresh), used as key by caches
+        return self._version
+
+    @property
+    def cdf(self):
+        # the shared frame itself (mutable), see the immutability contract above
+        if self._frame is not None : return self._frame
+        return self._pgcd.cdf
+
+    @property
+    def gdf(self):
+        return self._pgcd.gdf
+
+    def load_gdf(self, ** kwargs) :
+        # Geometries are loaded only once per process and per set of arguments
+        key = tuple(sorted(kwargs.items()))
+        with self._lock :
+            gdf = self._gdf_cache.get(key)
+            if gdf is None :
+                logger.debug(f"Load geometries with {kwargs}")
+                gdf = self._gdf_cache[key] = self._pgcd.load_gdf(** kwargs)
+        return gdf
+
+class SnapshotHandle() :
+
+    """
+    Stable reference to a snapshot, given to the componments of one session.
+    When data are reloaded, the session snapshot is replaced in a single step (swap) and
+    componments read the new data without being rebuilt. The immutability contract is the
+    same as DatasetSnapshot.
+    """
+
+    def __init__(self, snapshot) :
+        object.__setattr__(self, "_snapshot", snapshot)
+
+    def __getattr__(self, name) :
+        return getattr(self._snapshot, name)
+
+    def __setattr__(self, name, value) :
+        raise ReadOnlyError(f"Cannot set '{name}', snapshot is shared across sessions")
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    def swap(self, snapshot) :
+        object.__setattr__(self, "_snapshot", snapshot)
+
+# ---------------------------------------------------------------------------
+
+_SNAPSHOTS = {}
+_SNAPSHOTS_LOCK = threading.Lock()
+
+def get_snapshot(fname, head=0, backend="pgcd") :
+    # Return the process wide snapshot for this file, loading it on first call only
+    key = (os.path.realpath(fname), head, backend)
+
+    with _SNAPSHOTS_LOCK :
+        snapshot = _SNAPSHOTS.get(key)
+        if snapshot is None :
+            logger.debug(f"Create shared snapshot for {fname}")
+            snapshot = _SNAPSHOTS[key] = DatasetSnapshot.from_file(fname, head, backend)
+
+    return snapshot
+
+def reload_snapshot(fname, head=0, backend="pgcd") :
+    # Load data again and replace the process wide snapshot, sessions already opened keep
+    # the previous one until their handle is swapped (see server.reload)
+    key = (os.path.realpath(fname), head, backend)
+    snapshot = DatasetSnapshot.from_file(fname, head, backend)
+
+    with _SNAPSHOTS_LOCK :
+        _SNAPSHOTS[key] = snapshot
+
+    return snapshot
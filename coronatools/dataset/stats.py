@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 19:37:14
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 20:04:24
+
+"""
+Statistics catalog of a dataset version, used for color mappers and axis ranges
+instead of scanning pgcd.cdf at each field or mapper change.
+
+For each metric (or numeric static attribute) and geographic level : min, max, positive min (log scales) and quantiles
+of the reported values, over all days or for each day. Values are computed from the data
+cube (see dataset.cube) on first request of a (level, metric) and kept with the cube,
+so once per dataset version.
+"""
+
+import threading
+import warnings
+import weakref
+from collections import namedtuple
+
+import numpy as np
+
+Stats = namedtuple("Stats", ["min", "max", "posmin", "quantiles"])
+
+# One quantile bin per color of a 9 colors palette
+QUANTILES = np.linspace(0, 1, 10)
+
+class StatsCatalog() :
+
+    def __init__(self, cube, quantiles=QUANTILES) :
+        self._cube = cube
+        self._quantiles = np.asarray(quantiles)
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    @property
+    def quantiles(self):
+        return self._quantiles
+
+    def stats(self, metric, geocolumn="Country", day=None, report=False) :
+        # Over all days, or for one day
+        summary, days = self.level_stats(metric, geocolumn)
+        if day is None : return summary
+
+        idx = self._cube.day_index(day, report)
+        return Stats(* (values[idx] for values in days))
+
+    def level_stats(self, metric, geocolumn) :
+        key = (geocolumn, metric)
+        with self._lock :
+            if key not in self._stats :
+                self._stats[key] = self.compute(metric, geocolumn)
+            return self._stats[key]
+
+    def compute(self, metric, geocolumn) :
+        # metrics and static attributes (PopSize ...), the latter have the same values each day
+        level = self._cube.level(geocolumn)
+        values = np.where(level.present, self._cube.metric_table(metric, geocolumn=geocolumn), np.nan)
+        positive = np.where(values > 0, values, np.nan)
+
+        # days without report give NaN values
+        with warnings.catch_warnings() :
+            warnings.simplefilter("ignore", RuntimeWarning)
+            days = Stats(np.nanmin(values, axis=1), np.nanmax(values, axis=1), np.nanmin(positive, axis=1),
+                         np.nanquantile(values, self.quantiles, axis=1).T)
+
+            reported = values[level.present]
+            summary = Stats(np.nanmin(reported), np.nanmax(reported), np.nanmin(positive),
+                            np.nanquantile(reported, self.quantiles))
+
+        return summary, days
+
+# ---------------------------------------------------------------------------
+
+_CATALOGS = {}
+_CATALOGS_LOCK = threading.Lock()
+
+def shared_catalog(pgcd) :
+    # Catalog of the cube backend, or built once on pgcd.cdf
+    # the catalog does not keep the frame alive and is dropped with it (previous data version)
+    statistics = getattr(pgcd, "statistics", None)
+    if statistics is not None : return statistics()
+
+    from dataset.cube import CubeCoronaData
+
+    cdf = pgcd.cdf
+    key = id(cdf)
+
+    with _CATALOGS_LOCK :
+        ref, catalog = _CATALOGS.get(key, (None, None))
+        if ref is None or ref() is not cdf :
+            # no fallback, it would keep pgcd (and cdf) alive
+            catalog = StatsCatalog(CubeCoronaData(cdf))
+            _CATALOGS[key] = (weakref.ref(cdf), catalog)
+            weakref.finalize(cdf, _CATALOGS.pop, key, None)
+
+    return catalog
+
+def stats(pgcd, metric, geocolumn="Country", day=None) :
+    return shared_catalog(pgcd).stats(metric, geocolumn, day)
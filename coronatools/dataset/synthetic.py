@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 19:48:51
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 19:52:41
+
+"""
+Offline stand-in for PersistantGeoCoronaData, with generated data.
+
+Data follow the data.csv schema (same columns, types and formulas) for any number of
+locations and days, and are the same for a given seed. Locations are irregular polygons on
+a grid covering the world, grouped in subregions, world bank regions and continents.
+No network and no pycoronadata are needed, which makes scaling runs possible.
+
+Example :
+pgcd = SyntheticCoronaData(nlocations=10000, ndays=1000)
+worldmap.construct(pgcd)
+"""
+
+import math
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from shapely.geometry import Polygon, MultiPolygon
+
+from dataset.cube import CubeCoronaData
+
+import logging
+logger = logging.getLogger("coronatools")
+
+COLUMNS = ["Country", "ADM0_A3", "SubRegion", "REGION_WB", "Continent", "PopSize", "Date", "RepDays",
+           "Confirmed", "Deaths", "Recovered", "Active", "CODay", "REDay", "DEDay",
+           "LRate", "PrcCont", "CO10K", "DE10K", "RE10K", "AC10K"]
+
+CONTINENTS = ["Africa", "Asia", "Europe", "North America", "Oceania", "South America"]
+REGIONS_WB = ["East Asia & Pacific", "Europe & Central Asia", "Latin America & Caribbean",
+              "Middle East & North Africa", "North America", "South Asia", "Sub-Saharan Africa"]
+
+# first day of the bundled data, RepDays are counted from it
+FIRSTDAY = date(2020, 1, 22)
+
+def make_polygons(count, vertices=24, islands=7, seed=0) :
+    # Irregular polygons on a regular grid covering the world
+    # One location every islands has a small second polygon (MultiPolygon)
+    rng = np.random.default_rng(seed)
+    ncols = math.ceil(math.sqrt(count * 2))
+    nrows = math.ceil(count / ncols)
+    width, height = 360 / ncols, 180 / nrows
+    angles = np.linspace(0, 2 * np.pi, vertices, endpoint=False)
+
+    polygons = []
+    for idx in range(count) :
+        cx = -180 + (idx % ncols + .5) * width
+        cy = -90 + (idx // ncols + .5) * height
+        radius = rng.uniform(.3, .4, vertices)
+        polygon = Polygon(zip(cx + np.cos(angles) * radius * width, cy + np.sin(angles) * radius * height))
+
+        if islands and idx % islands == 0 :
+            island = Polygon(zip(cx + .45 * width + np.cos(angles) * .04 * width, cy + np.sin(angles) * .04 * height))
+            polygon = MultiPolygon([polygon, island])
+
+        polygons.append(polygon)
+
+    return polygons
+
+def location_names(count) :
+    width = len(str(count - 1))
+    return [f"Location {idx:0{width}d}" for idx in range(count)]
+
+def location_codes(count) :
+    # 3 letters codes, AAA, AAB ...
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return ["".join(letters[idx // 26 ** power % 26] for power in (2, 1, 0)) + ("" if idx < 26 ** 3 else str(idx // 26 ** 3))
+            for idx in range(count)]
+
+def ratio(numerator, denominator, factor=1) :
+    with np.errstate(divide="ignore", invalid="ignore") :
+        return np.where(denominator > 0, numerator / denominator, 0) * factor
+
+def make_regions(count, rng) :
+    # Locations are grouped by continent, then by subregion (3 per continent)
+    continents = np.sort(rng.integers(0, len(CONTINENTS), count))
+    subregions = rng.integers(0, 3, count)
+
+    return {
+        "Continent" : np.array(CONTINENTS)[continents],
+        "SubRegion" : np.char.add(np.array(CONTINENTS)[continents], np.array([" (North)", " (Center)", " (South)"])[subregions]),
+        "REGION_WB" : np.array(REGIONS_WB)[(continents + subregions) % len(REGIONS_WB)]
+        }
+
+def make_curves(count, ndays, rng) :
+    # Cumulative counts, one row per location, one column per day
+    # Logistic growth of confirmed cases, deaths and recovered follow with a delay
+    days = np.arange(ndays)
+
+    popsize = np.round(10 ** rng.uniform(5, 9, count)).astype(np.int64)
+    attack = rng.uniform(.001, .05, count)
+    growth = rng.uniform(.08, .3, count)
+    middle = rng.uniform(.2, .9, count) * ndays
+
+    confirmed = popsize[:, None] * attack[:, None] / (1 + np.exp(-growth[:, None] * (days[None, :] - middle[:, None])))
+    confirmed = np.maximum(np.floor(confirmed), 1).astype(np.int64)
+
+    def delayed(values, delay, rate) :
+        idx = np.clip(days[None, :] - delay[:, None], 0, None)
+        return np.floor(np.take_along_axis(values, idx, axis=1) * rate[:, None]).astype(np.int64)
+
+    lethality = rng.uniform(.005, .08, count)
+    deaths = delayed(confirmed, rng.integers(5, 11, count), lethality)
+    recovered = delayed(confirmed, rng.integers(10, 21, count), rng.uniform(.3, .9, count))
+
+    return popsize, confirmed, deaths, recovered
+
+def make_frame(nlocations, ndays, seed=0, firstday=FIRSTDAY) :
+    rng = np.random.default_rng(seed)
+
+    countries = location_names(nlocations)
+    regions = make_regions(nlocations, rng)
+    popsize, confirmed, deaths, recovered = make_curves(nlocations, ndays, rng)
+
+    # Each location starts to report on its own day, rows are kept from this day only
+    first = rng.integers(0, max(1, ndays // 3), nlocations)
+    first[0] = 0
+    kept = (np.arange(ndays)[None, :] >= first[:, None]).ravel()
+
+    lidx = np.repeat(np.arange(nlocations), ndays)[kept]
+    didx = np.tile(np.arange(ndays), nlocations)[kept]
+
+    def daily(values) :
+        return np.diff(values, axis=1, prepend=0).ravel()[kept]
+
+    daily_values = {"CODay" : daily(confirmed), "REDay" : daily(recovered), "DEDay" : daily(deaths)}
+    confirmed, deaths, recovered = (values.ravel()[kept] for values in (confirmed, deaths, recovered))
+    active = confirmed - deaths - recovered
+    pop = popsize[lidx].astype(float)
+
+    dates = [str(firstday + timedelta(days=idx)) for idx in range(ndays)]
+
+    def categorical(values, idx) :
+        categories, codes = np.unique(np.asarray(values), return_inverse=True)
+        return pd.Categorical.from_codes(codes[idx], categories)
+
+    data = {
+        "Country" : categorical(countries, lidx),
+        "ADM0_A3" : categorical(location_codes(nlocations), lidx),
+        "SubRegion" : categorical(regions["SubRegion"], lidx),
+        "REGION_WB" : categorical(regions["REGION_WB"], lidx),
+        "Continent" : categorical(regions["Continent"], lidx),
+        "PopSize" : popsize[lidx],
+        "Date" : pd.Categorical.from_codes(didx, dates),
+        "RepDays" : didx + (firstday - FIRSTDAY).days,
+        "Confirmed" : confirmed,
+        "Deaths" : deaths,
+        "Recovered" : recovered,
+        "Active" : active,
+        ** daily_values,
+        "LRate" : ratio(deaths, deaths + recovered),
+        "PrcCont" : ratio(confirmed + deaths + recovered, pop),
+        "CO10K" : ratio(confirmed, pop, 1e4),
+        "DE10K" : ratio(deaths, pop, 1e4),
+        "RE10K" : ratio(recovered, pop, 1e4),
+        "AC10K" : ratio(active, pop, 1e4)
+        }
+
+    return pd.DataFrame({column : data[column] for column in COLUMNS})
+
+class SyntheticCoronaData() :
+
+    """
+    Generated data with the subset of the PersistantGeoCoronaData interface used by componments :
+    cdf, gdf, load_gdf, df2gdf, firstday, lastday, unique, data_from_day and data_from_geocol
+    (and the cube top_from_day, rank_table, metric_table and statistics queries).
+    Queries are answered by a dataset.cube backend built on the generated frame.
+    """
+
+    def __init__(self, nlocations=200, ndays=100, seed=0, firstday=FIRSTDAY) :
+        logger.debug(f"Generate synthetic data for {nlocations} locations and {ndays} days")
+
+        self._nlocations = nlocations
+        self._ndays = ndays
+        self._seed = seed
+
+        self._cdf = make_frame(nlocations, ndays, seed, firstday)
+        self._gdf = None
+        self._cube = CubeCoronaData(self._cdf)
+
+    @property
+    def nlocations(self):
+        return self._nlocations
+
+    @property
+    def ndays(self):
+        return self._ndays
+
+    @property
+    def seed(self):
+        return self._seed
+
+    @property
+    def cdf(self):
+        return self._cdf
+
+    @property
+    def gdf(self):
+        # polygons are built on first use only, most benchmarks do not need them
+        if self._gdf is None :
+            import geopandas
+            regions = self._cdf.drop_duplicates("Country")[["Country", "ADM0_A3", "SubRegion", "REGION_WB", "Continent"]]
+            regions = regions.astype(str).reset_index(drop=True)
+            self._gdf = geopandas.GeoDataFrame(regions, geometry=make_polygons(self.nlocations, seed=self.seed), crs="EPSG:4326")
+        return self._gdf
+
+    def load_gdf(self, default_detail=110) :
+        # A single level of detail
+        return self.gdf
+
+    def df2gdf(self, df, geocolumn, light=True) :
+        import geopandas
+        gdf = self.gdf[[geocolumn, "geometry"]] if geocolumn == "Country" else self.gdf.dissolve(geocolumn).reset_index()[[geocolumn, "geometry"]]
+        return geopandas.GeoDataFrame(gdf.merge(df, on=geocolumn, how="right"), crs=gdf.crs)
+
+    def firstday(self, report=False) :
+        return self._cube.firstday(report)
+
+    def lastday(self, report=False) :
+        return self._cube.lastday(report)
+
+    def unique(self, column) :
+        return self._cube.unique(column)
+
+    def data_from_day(self, day=None, report=False, fill=False, geocolumn="Country") :
+        return self._cube.data_from_day(day=day, report=report, fill=fill, geocolumn=geocolumn)
+
+    def data_from_geocol(self, location, geocolumn, fill=True, as_datetime=False) :
+        return self._cube.data_from_geocol(location, geocolumn, fill=fill, as_datetime=as_datetime)
+
+    def top_from_day(self, column, n=None, day=None, report=False, geocolumn="Country") :
+        return self._cube.top_from_day(column, n=n, day=day, report=report, geocolumn=geocolumn)
+
+    def rank_table(self, column, n, geocolumn="Country") :
+        return self._cube.rank_table(column, n, geocolumn=geocolumn)
+
+    def metric_table(self, column, locations=None, geocolumn="Country") :
+        return self._cube.metric_table(column, locations=locations, geocolumn=geocolumn)
+
+    def statistics(self) :
+        return self._cube.statistics()
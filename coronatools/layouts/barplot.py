@@ -2,9 +2,7 @@
 # @Author: jsgounot
 # @Date:   2020-03-26 12:35:34
 # @Last modified by:   jsgounot
-# @Last Modified time: 2020-04-01 01:20:39
-
-from datetime import datetime
+# @Last Modified time: 2026-10-17 20:02:47
 
 import pandas as pd
 
@@ -21,7 +19,20 @@ def set_region(pgcd, slider, region) :
 
 def convert_slider_date(value) :
     # took me forever to find that ...
-    return datetime.fromtimestamp(value / 1000).date()
+    return lutils.slider_date(value)
+
+def update(barplot, slider) :
+    # New data available (see server.reload), same behaviour than the worldmap
+    lastday = barplot.pgcd.lastday()
+    following = convert_slider_date(slider.value) == convert_slider_date(slider.end)
+    slider.end = lastday
+
+    # the barplot follows value_throttled, which is not changed by the server
+    if following and convert_slider_date(slider.value) != lastday :
+        slider.value = lastday
+        barplot.date = lastday
+    else :
+        barplot.update()
 
 def construct(pgcd, controller=None) :
     lastday = pgcd.lastday()
@@ -35,7 +46,9 @@ def construct(pgcd, controller=None) :
 
     # Select day
     slider_date = DateSlider(title="Date", start=firstday, end=lastday, value=lastday, step=1, format="%Y-%d-%m", sizing_mode="stretch_width")
-    barplot.link_on_change("date", slider_date, postfun=convert_slider_date)
+    # the server gets the released date, dragging is drawn client side (see link_scrubber below)
+    # quick releases (keyboard steps) only keep the latest date
+    barplot.link_on_change("date", slider_date, "value_throttled", postfun=convert_slider_date, coalesce="latest")
 
     # nice but not really effective. Keep it here if needed later somewhere else
     #slider_date = DatePicker(sizing_mode="stretch_width", min_date=firstday, max_date=lastday, value=lastday)
@@ -52,14 +65,19 @@ def construct(pgcd, controller=None) :
    
     # Slider
     slider_ndisplay = Slider(title='Number of elements', start=2, end=10, step=1, value=5, sizing_mode="stretch_width")
-    barplot.link_on_change("ndisplay", slider_ndisplay)
+    # same for the number of bars, the server only draws more than topk bars (see DynamicBarPlot.ndisplay)
+    barplot.link_on_change("ndisplay", slider_ndisplay, "value_throttled", coalesce="latest")
     select_region.on_change("value", lambda attr, old, new : set_region(pgcd, slider_ndisplay, new))
 
+    # Date and number of bars (up to topk) are drawn client side while sliders move, the server follows on release
+    barplot.link_scrubber(slider_date, slider_ndisplay, topk=30)
+
     # Controller
     if controller :
         controller.add_receiver("change_region", lambda region : barplot_new_region(barplot, slider_ndisplay, region))
         barplot.link_to_controller("date", controller, "bp_date")
         barplot.add_receiver("doubletap", lambda location : controller.emit_signal("location", location))
+        controller.add_receiver("update", lambda : update(barplot, slider_date))
 
     select_region.value = default_geocolumn
 
@@ -2,7 +2,7 @@
 # @Author: jsgounot
 # @Date:   2020-03-25 23:11:56
 # @Last modified by:   jsgounot
-# @Last Modified time: 2020-04-17 19:20:06
+# @Last Modified time: 2026-10-17 19:29:42
 
 import numpy as np
 
@@ -24,41 +24,44 @@ class LayoutController(BLC) :
         super().__init__(* args, ** kwargs)
         
         self.componments = {}
+        self._dt_region = None
         
-        # Add trigger
-        self.add_on_change_fun("region", self.change_region)
-        
-        self.add_on_change_fun("xname", self.change_ax_name)
-        self.add_on_change_fun("yname", self.change_ax_name)
+        # Add trigger, the same one for all so a batch recomputes once
+        for attr in ("region", "xname", "yname") :
+            self.add_on_change_fun(attr, self.change_view)
 
     @property
     def cpn(self):
         return self.componments
+
+    @property
+    def document(self) :
+        datatable = self.cpn.get("datatable")
+        return None if datatable is None else datatable.dt.document
     
     def change_selection(self, df) :
         locations = set(df["Location"])
         self.cpn["mlp"].change_locations(locations)
 
-    def change_ax_name(self, attr, new) :
-        if attr == "xname" :
-            self.cpn["mlp"].xcol = new
-        elif attr == "yname" :
-            self.cpn["mlp"].ycol = new 
-        else :
-            raise ValueError("attr must be xname or yname")
-
-        datatable = self.cpn["datatable"]
-        datatable.keep_selections = True
+    def change_view(self, attr, new) :
         self.update_dt()
-        datatable.keep_selections = False
+        self.cpn["mlp"].set_columns(gcol=self.region, xcol=self.xname, ycol=self.yname)
 
-    def change_region(self, attr, new) :
-        self.update_dt()
-        self.cpn["mlp"].gcol = new
+    def update(self) :
+        # New data available (see server.reload)
+        with self.batch() :
+            self.update_dt()
+            self.cpn["mlp"].update()
 
     def update_dt(self) :
+        # selections are kept while the region does not change
+        datatable = self.cpn["datatable"]
+        datatable.keep_selections = self._dt_region == self.region
+        self._dt_region = self.region
+
         self.df = self.get_dt_df()
-        self.cpn["datatable"].df = self.df
+        datatable.df = self.df
+        datatable.keep_selections = False
 
     def get_dt_df(self) :
         # Add location to data table
@@ -107,10 +110,11 @@ def construct(pgcd, controller=None) :
     tooltips["data_x"].format = "%F"
     kwargs_hovertool = {"formatters": {'$data_x': 'datetime'}}
 
+    # both panels draw the same sources, zeros are hidden client side on the log one
     mlp = PAT(MultiLinesPlotScatter, (axtype1, axtype2),
               pgcd, gcol=default_reg, xcol=default_col[0], ycol=default_col[1],
               aspect_ratio=2, sizing_mode="scale_both", tools=["reset"],
-              tooltips=tooltips, kwargs_hovertool=kwargs_hovertool)
+              tooltips=tooltips, kwargs_hovertool=kwargs_hovertool, shared=True)
 
     lc.cpn["mlp"] = mlp
 
@@ -146,6 +150,9 @@ def construct(pgcd, controller=None) :
 
     lc.update_dt()
 
+    if controller :
+        controller.add_receiver("update", lc.update)
+
     # Default : Asia, Europe and North America
     dt.source.selected.indices = [2, 3, 4]
 
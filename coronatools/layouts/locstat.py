@@ -2,7 +2,7 @@
 # @Author: jsgounot
 # @Date:   2020-03-26 12:37:22
 # @Last modified by:   jsgounot
-# @Last Modified time: 2020-04-01 03:26:46
+# @Last Modified time: 2026-10-17 19:08:03
 
 from bokeh.models import Select, DateRangeSlider
 from bokeh.layouts import row, column
@@ -28,6 +28,11 @@ def change_region(pgcd, select, region) :
     select.options = values
     select.value = values[0]
 
+def update(mlp, spl) :
+    # New data available (see server.reload)
+    mlp.set_data_source()
+    spl.set_data_source()
+
 def construct(pgcd, controller=None) :
     ckind = "global"
     region = "Continent"
@@ -63,6 +68,7 @@ def construct(pgcd, controller=None) :
         mlp.link_to_controller("geocolumn", controller, "change_region")
         spl.link_to_controller("geocolumn", controller, "change_region")
         controller.add_receiver("change_region", lambda region : change_region(pgcd, select_location, region))
+        controller.add_receiver("update", lambda : update(mlp, spl))
 
     # trigger event
     select_region.value = region
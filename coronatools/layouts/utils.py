@@ -2,7 +2,9 @@
 # @Author: jsgounot
 # @Date:   2020-03-26 11:45:36
 # @Last modified by:   jsgounot
-# @Last Modified time: 2020-05-03 18:15:19
+# @Last Modified time: 2026-10-17 19:08:03
+
+from datetime import date, datetime
 
 from bokeh.models import DateFormatter, NumberFormatter
 
@@ -19,6 +21,12 @@ DESCRIPTIONS = {"LRate" : "Lethality rate", "CODay" : "Daily confirmed", "DEDay"
         "AC10K" : "Active per 10K", "CO10K" : "Confirmed per 10K", "DE10K" : "Deaths per 10K", "RE10K" : "Recovered per 10K"
         }
 
+def slider_date(value) :
+    # DateSlider values are dates when set server side, timestamps (ms) when changed by the client
+    if isinstance(value, datetime) : return value.date()
+    if isinstance(value, date) : return value
+    return datetime.fromtimestamp(value / 1000).date()
+
 def reverse_mapping(mapper, name) :
     mapper = {value : key for key, value in mapper.items()}
     return mapper.get(name, name)
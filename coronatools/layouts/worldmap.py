@@ -2,7 +2,7 @@
 # @Author: jsgounot
 # @Date:   2020-03-26 11:38:02
 # @Last modified by:   jsgounot
-# @Last Modified time: 2020-04-01 03:08:21
+# @Last Modified time: 2026-10-17 19:40:42
 
 import logging
 logger = logging.getLogger("coronatools")
@@ -39,9 +39,23 @@ def carto_shift_day(upper, carto, slider) :
 
 def convert_slider_date(value, asdate=True) :
     # took me forever to find that ...
-    value = datetime.fromtimestamp(value / 1000)
-    value = value.date() if asdate else value
-    return value
+    if asdate : return lutils.slider_date(value)
+    return datetime.fromtimestamp(value / 1000)
+
+def update(slider, carto) :
+    # New data available (see server.reload)
+    # We extend the slider and move to the new last day if the user was looking at the last one
+    lastday = carto.pgcd.lastday()
+    following = convert_slider_date(slider.value) == convert_slider_date(slider.end)
+    slider.end = lastday
+
+    if following and convert_slider_date(slider.value) != lastday :
+        slider.value = lastday
+    else :
+        carto.set_data_source()
+
+    carto.set_mapper()
+    carto.reset_frames()
 
 def construct(pgcd, controller=None) :
     df_column = "Confirmed"
@@ -53,11 +67,16 @@ def construct(pgcd, controller=None) :
     title = 'Coronavirus map : Day ' + str(lastday)
     tooltips = lutils.tooltips()
     tools = [PanTool(), WheelZoomTool(), ResetTool()]
-    carto = WMap(pgcd, lastday, df_column, title=title, mkind=mapper, tooltips=tooltips, aspect_ratio=2, sizing_mode="scale_both", tools=tools)
+    carto = WMap(pgcd, lastday, df_column, title=title, mkind=mapper, tooltips=tooltips, static_geometry=True,
+                 aspect_ratio=2, sizing_mode="scale_both", tools=tools)
+
+    # Finer borders for the visible extent when zooming
+    carto.link_viewport(maxpoints=10000)
 
     # Make a slider object: slider  
     slider = DateSlider(title="Date", start=firstday, end=lastday, value=lastday, step=1, format="%Y-%d-%m", sizing_mode="stretch_width")
-    carto.link_on_change("date", slider, postfun=convert_slider_date)
+    # dragging the slider sends many dates, the ones already outdated are skipped
+    carto.link_on_change("date", slider, postfun=convert_slider_date, coalesce="throttle", interval=150)
 
     # Make buttons
     lambda_callback_bleft = lambda : carto_shift_day(False, carto, slider)
@@ -68,6 +87,9 @@ def construct(pgcd, controller=None) :
     bright = Button(label="Day +1", button_type="success", width=200)
     bright.on_click(lambda_callback_bright)
 
+    # Days are played in the browser, the slider is synced when playback stops
+    bplay = carto.make_player(slider, fps=8, button_type="primary", width=200)
+
     # Select for carto 
     options = [df_column for df_column in lutils.columns_description() if df_column not in ["Date"]]
     scol = Select(title="", options=options, value=df_column, width=200)
@@ -86,5 +108,5 @@ def construct(pgcd, controller=None) :
     
     return column(
         carto.figure, slider, 
-        row(bleft, bright, scol, smap, sizing_mode="stretch_width"), 
+        row(bleft, bright, bplay, scol, smap, sizing_mode="stretch_width"), 
         sizing_mode="stretch_both")
\ No newline at end of file
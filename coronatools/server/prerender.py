@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 19:42:14
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 19:51:12
+
+"""
+Static snapshots of every layout for the last day, served without a bokeh session.
+
+Each layout (and a few common views of it) is built once with the current data and written as
+a standalone html page and as a json_item, data sources inlined. Widgets are not connected to
+a server in these pages, a proxy or a static server can cache them and only open the live
+application (the server/se_*.py file of the manifest) when the user wants to interact.
+
+python server/prerender.py [--outdir data.csv.static] [--inline]
+
+data.csv.static/
+    manifest.json
+    worldmap.html
+    worldmap.json
+    worldmap.deaths.html
+    ...
+"""
+
+import os
+rpath = os.path.realpath(__file__)
+dname = os.path.dirname
+
+import sys
+sys.path.insert(0, dname(dname(rpath)))
+
+import json
+import argparse
+from datetime import datetime
+
+import logging
+logger = logging.getLogger("coronatools")
+
+from bokeh.embed import file_html, json_item
+from bokeh.resources import CDN, INLINE
+from bokeh.models import Select, RadioButtonGroup
+
+from componments.base.utils import SignalControl
+from dataset import refresh
+from dataset.snapshot import SnapshotHandle
+from layouts import worldmap, barplot, compare, locstat
+from layouts import utils as lutils
+from server import utils as sutils
+
+# name : (module, title, live application), titles are the ones of the server files
+LAYOUTS = {
+    "worldmap" : (worldmap, "CoronaMap", "se_worldmap"),
+    "barplot" : (barplot, "BarPlot", "se_barplot"),
+    "compare" : (compare, "Compare", "se_compare"),
+    "locstat" : (locstat, "MLP Daily", "se_locstat")
+    }
+
+# name : {view : [(model query, attribute, value)]}, changes done on the default view widgets
+# the default view (None) is the one opened by the server
+VIEWS = {
+    "worldmap" : {None : [], "deaths" : [({"type" : Select, "title" : ""}, "value", lutils.description("Deaths"))]},
+    "barplot" : {None : [], "deaths" : [({"type" : Select, "title" : "Sort by"}, "value", "Deaths")]},
+    "compare" : {None : [], "country" : [({"type" : RadioButtonGroup}, "active", 1)]},
+    "locstat" : {None : []}
+    }
+
+def static_dir(fname) :
+    return fname + ".static"
+
+def view_name(name, view) :
+    return name if view is None else f"{name}.{view}"
+
+def set_view(root, changes) :
+    # Widgets callbacks are run directly outside a session, as a user change would do
+    for query, attr, value in changes :
+        models = [model for model in root.select(query) if attr != "value" or value in getattr(model, "options", [value])]
+        if not models : raise LookupError(f"No model found with {query} for {attr} = {value}")
+        setattr(models[0], attr, value)
+
+def construct(pgcd, name, changes=()) :
+    module = LAYOUTS[name][0]
+    root = module.construct(SnapshotHandle(pgcd), SignalControl())
+    set_view(root, changes)
+    return root
+
+def write(fname, content) :
+    # Written atomically and readable by the static server (see refresh.atomic_write)
+    refresh.atomic_write(fname, lambda f : f.write(content))
+
+def quiet_json_item(root, target) :
+    # json_item has no suppress_callback_warning option
+    embed_logger = logging.getLogger("bokeh.embed.util")
+    level = embed_logger.level
+    embed_logger.setLevel(logging.ERROR)
+    try : return json_item(root, target)
+    finally : embed_logger.setLevel(level)
+
+def render(pgcd, outdir, inline=False, layouts=tuple(LAYOUTS)) :
+    os.makedirs(outdir, exist_ok=True)
+    resources = INLINE if inline else CDN
+
+    manifest = {
+        "date" : datetime.now().isoformat(timespec="seconds"),
+        "version" : getattr(pgcd, "version", None),
+        "lastday" : str(pgcd.lastday()),
+        "layouts" : {}
+        }
+
+    for name in layouts :
+        module, title, application = LAYOUTS[name]
+        views = {}
+
+        for view, changes in VIEWS[name].items() :
+            vname = view_name(name, view)
+            logger.debug(f"Prerender {vname}")
+
+            # python callbacks are expected here, they are only used by the live application
+            root = construct(pgcd, name, changes)
+            html = file_html(root, resources, title, suppress_callback_warning=True)
+            write(os.path.join(outdir, vname + ".html"), html)
+            write(os.path.join(outdir, vname + ".json"), json.dumps(quiet_json_item(root, vname)))
+
+            views[view or "default"] = {"html" : vname + ".html", "json" : vname + ".json"}
+
+        manifest["layouts"][name] = {"title" : title, "application" : application, "views" : views}
+
+    # manifest last, it only lists complete files
+    write(os.path.join(outdir, "manifest.json"), json.dumps(manifest, indent=2))
+    return manifest
+
+def main(outdir=None, inline=False) :
+    return render(sutils.shared_pgcd(), outdir or static_dir(sutils.DATA_FNAME), inline)
+
+if __name__ == "__main__" :
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--outdir", help="Output directory (default : data.csv.static next to data.csv)")
+    parser.add_argument("--inline", action="store_true", help="Inline bokeh js and css, for offline pages")
+    args = parser.parse_args()
+    main(outdir=args.outdir, inline=args.inline)
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 19:08:03
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 19:09:42
+
+"""
+Reload data in a running server without restart.
+
+A thread watches the data file (dataset version, size and mtime). When it changes,
+a new snapshot is loaded in this thread, then each opened session receives it with
+add_next_tick_callback : the session handle is swapped and the controller emits the
+"update" signal, layouts then extend their sliders and refresh the current view.
+Documents are never rebuilt.
+"""
+
+import os
+import threading
+from functools import partial
+
+import logging
+logger = logging.getLogger("coronatools")
+
+from dataset import refresh
+from dataset.snapshot import SnapshotHandle, get_snapshot, reload_snapshot
+
+class DataWatcher() :
+
+    def __init__(self, fname, head=0, interval=60, backend="pgcd") :
+        self._fname = fname
+        self._head = head
+        self._backend = backend
+        self._interval = interval
+
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._state = self.file_state()
+
+    @property
+    def fname(self):
+        return self._fname
+
+    @property
+    def interval(self):
+        return self._interval
+
+    def file_state(self) :
+        stat = os.stat(self.fname)
+        return (refresh.read_version(self.fname), stat.st_size, stat.st_mtime_ns)
+
+    def register(self, document, controller) :
+        # Return the data handle of a new session
+        handle = SnapshotHandle(get_snapshot(self.fname, self._head, self._backend))
+
+        with self._lock :
+            self._sessions[id(document)] = (document, handle, controller)
+
+        document.on_session_destroyed(lambda session_context : self.unregister(document))
+        self.start()
+
+        return handle
+
+    def unregister(self, document) :
+        with self._lock :
+            self._sessions.pop(id(document), None)
+
+    def start(self) :
+        with self._lock :
+            if self._thread is not None : return
+            self._thread = threading.Thread(target=self.run, name="coronatools-data-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self) :
+        self._stop.set()
+
+    def run(self) :
+        while not self._stop.wait(self.interval) :
+            try : self.check()
+            except Exception :
+                logger.exception("Unable to reload data")
+
+    def check(self) :
+        state = self.file_state()
+        if state == self._state : return False
+
+        logger.debug(f"Data file changed, reload data ({state})")
+        snapshot = reload_snapshot(self.fname, self._head, self._backend)
+        self._state = state
+        self.push(snapshot)
+        return True
+
+    def push(self, snapshot) :
+        with self._lock :
+            sessions = list(self._sessions.values())
+
+        logger.debug(f"Push new data to {len(sessions)} sessions")
+        for document, handle, controller in sessions :
+            document.add_next_tick_callback(partial(DataWatcher.apply, handle, controller, snapshot))
+
+    @staticmethod
+    def apply(handle, controller, snapshot) :
+        # Run in the session document lock
+        handle.swap(snapshot)
+        controller.emit_signal("update")
+
+# ---------------------------------------------------------------------------
+
+_WATCHERS = {}
+_WATCHERS_LOCK = threading.Lock()
+
+def get_watcher(fname, head=0, interval=60, backend="pgcd") :
+    key = (os.path.realpath(fname), head, backend)
+    with _WATCHERS_LOCK :
+        watcher = _WATCHERS.get(key)
+        if watcher is None :
+            watcher = _WATCHERS[key] = DataWatcher(fname, head, interval, backend)
+    return watcher
@@ -2,7 +2,7 @@
 # @Author: jsgounot
 # @Date:   2020-03-31 11:46:52
 # @Last modified by:   jsgounot
-# @Last Modified time: 2020-04-17 14:27:18
+# @Last Modified time: 2026-10-17 19:08:03
 
 import os
 rpath = os.path.realpath(__file__)
@@ -13,7 +13,7 @@ sys.path.insert(0, dname(dname(rpath)))
 print (dname(dname(rpath)))
 
 from bokeh.io import curdoc
-from pycoronadata import PersistantGeoCoronaData
+from componments.base.utils import SignalControl
 from layouts import compare as compare_layout
 
 from server import utils as sutils
@@ -23,11 +23,11 @@ def launch_server(head=0) :
     logger = sutils.coronatool_logger()
     logger.debug("Load PGC data")
 
-    fname = os.path.join(dname(rpath), "data.csv")
-    pgcd = PersistantGeoCoronaData(fname=fname, head=head)
+    controller = SignalControl()
+    pgcd = sutils.session_pgcd(curdoc(), controller, head=head)
     logger.debug("Done loading PGC data")
 
-    mlayout = compare_layout.construct(pgcd, None)
+    mlayout = compare_layout.construct(pgcd, controller)
     
     curdoc().add_root(mlayout)
     curdoc().title = "Compare"
@@ -2,15 +2,43 @@
 # @Author: jsgounot
 # @Date:   2020-04-17 14:22:17
 # @Last modified by:   jsgounot
-# @Last Modified time: 2020-04-17 14:24:19
+# @Last Modified time: 2026-10-17 20:06:18
 
 import os
 rpath = os.path.realpath(__file__)
 dname = os.path.dirname
 
+import sys
+sys.path.insert(0, dname(dname(rpath)))
+
+import argparse
+
 from pycoronadata import PersistantGeoCoronaData
+from dataset import geocache, refresh
+from server import prerender
+
+def main(full=False, static=False) :
+    fname = os.path.join(dname(rpath), "data.csv")
+    pgcd = PersistantGeoCoronaData(fname=fname)
+    pgcd.update()
+
+    if full :
+        pgcd.save()
+        refresh.bump_version(fname)
+    else :
+        # written atomically, and only when the data changed
+        refresh.save(fname, pgcd.cdf)
+
+    # worldmap geojson of previous versions, days of this one are computed on request
+    geocache.GeoJSONCache(geocache.cache_dir(fname), refresh.dataset_version(fname)).clean()
+
+    # static pages of the last day, see server.prerender
+    if static :
+        prerender.main()
 
-fname = os.path.join(dname(rpath), "data.csv")
-pgcd = PersistantGeoCoronaData(fname=fname)
-pgcd.update()
-pgcd.save()
\ No newline at end of file
+if __name__ == "__main__" :
+    parser = argparse.ArgumentParser(description="Fetch new data and update data.csv")
+    parser.add_argument("--full", action="store_true", help="rewrite the whole file")
+    parser.add_argument("--static", action="store_true", help="prerender static pages of every layout")
+    args = parser.parse_args()
+    main(args.full, args.static)
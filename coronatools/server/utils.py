@@ -2,10 +2,36 @@
 # @Author: jsgounot
 # @Date:   2020-03-31 22:34:42
 # @Last modified by:   jsgounot
-# @Last Modified time: 2020-04-17 14:21:36
+# @Last Modified time: 2026-10-17 20:08:46
 
+import os
 import logging
 
+from dataset.snapshot import get_snapshot
+from server.reload import get_watcher
+
+DATA_FNAME = os.path.join(os.path.dirname(os.path.realpath(__file__)), "data.csv")
+
+# data queries backend, "pgcd" (PersistantGeoCoronaData) or "cube" (dataset.cube)
+# pgcd stays the default until tests/test_parity.py passes against pycoronadata on data.csv,
+# it could not be run with pycoronadata so far. The cube can be tried with CORONATOOLS_BACKEND=cube
+DATA_BACKEND = os.environ.get("CORONATOOLS_BACKEND", "pgcd")
+
+def shared_pgcd(head=0) :
+    # Data are loaded once per server process and shared (read only) between sessions
+    # See dataset.snapshot.DatasetSnapshot for what can and cannot be done with it
+    return get_snapshot(DATA_FNAME, head=head, backend=DATA_BACKEND)
+
+def session_pgcd(document, controller, head=0) :
+    # Shared data for one session, following data file updates
+    # controller emits "update" when new data are available (see server.reload)
+    return get_watcher(DATA_FNAME, head=head, backend=DATA_BACKEND).register(document, controller)
+
+def on_server_loaded(server_context) :
+    # Bokeh lifecycle hook, preload data before the first session is opened
+    # only run from the app_hooks.py of a directory application (see README)
+    shared_pgcd()
+
 def coronadata_logger() :
     return logging.getLogger("pycoronadata")
 
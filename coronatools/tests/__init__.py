@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 20:01:39
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 20:01:39
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 20:01:39
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 20:01:39
+
+# Modules are imported from the coronatools directory, as the server files do
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import pytest
+
+from dataset.synthetic import SyntheticCoronaData
+
+@pytest.fixture(scope="session")
+def synthetic() :
+    return SyntheticCoronaData(nlocations=40, ndays=30)
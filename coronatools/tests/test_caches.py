@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 20:04:09
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 20:04:09
+
+import gc
+from types import SimpleNamespace
+
+from dataset import geocache, stats
+from dataset.synthetic import SyntheticCoronaData
+
+def test_catalog_dropped_with_frame(synthetic) :
+    pgcd = SimpleNamespace(cdf=synthetic.cdf.copy())
+    stats.shared_catalog(pgcd)
+    assert id(pgcd.cdf) in stats._CATALOGS
+
+    key = id(pgcd.cdf)
+    del pgcd
+    gc.collect()
+    assert key not in stats._CATALOGS
+
+def test_geometries_dropped_with_data() :
+    # a reloaded dataset comes with new geometry frames, the previous ones are released
+    pgcd = SyntheticCoronaData(nlocations=20, ndays=5)
+    geocache.shared_patches(pgcd)
+    index = geocache.shared_index(pgcd)
+    assert geocache.shared_index(pgcd) is index
+
+    keys = [key for key in geocache._GEOMETRIES if key[1] == id(pgcd.gdf)]
+    assert len(keys) == 2
+
+    del pgcd, index
+    gc.collect()
+    assert not any(key in geocache._GEOMETRIES for key in keys)
+
+def test_geojson_cache_keeps_current_version() :
+    old = geocache.shared_cache(SimpleNamespace(fname="data.csv", version="a"))
+    new = geocache.shared_cache(SimpleNamespace(fname="data.csv", version="b"))
+    assert old is not new
+    assert [key for key in geocache._CACHES if key[0] == "data.csv"] == [("data.csv", "b")]
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 20:02:56
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 20:02:56
+
+import pytest
+
+def test_top_from_day_metric(synthetic) :
+    day = synthetic.lastday()
+    expected = synthetic.data_from_day(day).sort_values("Deaths", ascending=False, kind="stable").head(5)
+    top = synthetic.top_from_day("Deaths", n=5, day=day)
+    assert list(top["Deaths"]) == list(expected["Deaths"])
+
+@pytest.mark.parametrize("geocolumn", ["Country", "Continent"])
+def test_top_from_day_attribute(synthetic, geocolumn) :
+    # PopSize is a static attribute, ranked the same way each day among reporting locations
+    for day in (synthetic.firstday(), synthetic.lastday()) :
+        df = synthetic.data_from_day(day, geocolumn=geocolumn)
+        top = synthetic.top_from_day("PopSize", n=3, day=day, geocolumn=geocolumn)
+        assert list(top["PopSize"]) == sorted(df["PopSize"], reverse=True)[:3]
+
+def test_rank_table_attribute(synthetic) :
+    table = synthetic.rank_table("PopSize", 4)
+    assert (table["PopSize"][:, :-1] >= table["PopSize"][:, 1:]).all()
+
+def test_rank_non_numeric(synthetic) :
+    with pytest.raises(KeyError, match="Can not rank") :
+        synthetic.top_from_day("ADM0_A3", n=3)
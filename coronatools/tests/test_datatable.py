@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 20:09:00
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 20:09:00
+
+import pandas as pd
+
+from componments.base.datatable import DataTable
+
+def make_table() :
+    df = pd.DataFrame({"Country" : [f"C{idx:03d}" for idx in range(100)], "Confirmed" : range(100)})
+    return DataTable(df=df, page_size=10)
+
+def test_sort_first_page() :
+    table = make_table()
+    table.page = 4
+    assert table.page == 4
+
+    table.sort("Confirmed", ascending=False)
+    assert table.page == 0
+    assert table.source.data["Confirmed"][0] == 99
+
+def test_search_first_page() :
+    table = make_table()
+    table.page = 4
+    table.subset("Country", "C00")
+    assert table.page == 0
+    assert table.npages == 1
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 20:07:36
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 20:07:36
+
+"""
+Cube backend (dataset.cube) against pycoronadata day and location queries.
+
+test_pgcd_* run on server/data.csv and need pycoronadata, they are the check to pass
+before server.utils.DATA_BACKEND is set to "cube". The other tests compare the cube with
+a pandas version of the fill=False semantic on synthetic data.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataset.cube import CubeCoronaData, RATIOS
+
+DATA_FNAME = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "server", "data.csv")
+GEOCOLUMNS = ["Country", "SubRegion", "REGION_WB", "Continent"]
+SUMMED = ["PopSize", "Confirmed", "Deaths", "Recovered", "Active", "CODay", "REDay", "DEDay"]
+
+def assert_same_frames(expected, result, geocolumn) :
+    # Same locations, same values for the columns of both frames
+    expected = expected.sort_values(geocolumn).reset_index(drop=True)
+    result = result.sort_values(geocolumn).reset_index(drop=True)
+    assert list(result[geocolumn].astype(str)) == list(expected[geocolumn].astype(str))
+
+    for column in expected.columns :
+        if column not in result.columns : continue
+        evalues, rvalues = expected[column], result[column]
+
+        if column == "Date" :
+            assert (pd.to_datetime(evalues.astype(str)) == pd.to_datetime(rvalues.astype(str))).all()
+        elif pd.api.types.is_numeric_dtype(evalues) :
+            assert np.allclose(rvalues.to_numpy(float), evalues.to_numpy(float), rtol=1e-6, equal_nan=True), column
+        else :
+            assert list(rvalues.astype(str)) == list(evalues.astype(str)), column
+
+def reference_day(cdf, day, geocolumn) :
+    # fill=False : rows of this day, groups sum the countries reporting this day
+    df = cdf[pd.to_datetime(cdf["Date"].astype(str)).dt.date == day]
+    if geocolumn == "Country" : return df
+
+    df = df.groupby(geocolumn, observed=True)[SUMMED].sum().reset_index()
+    for metric, (numerator, denominator, factor) in RATIOS.items() :
+        num, den = df[list(numerator)].sum(axis=1), df[list(denominator)].sum(axis=1)
+        df[metric] = np.where(den > 0, num / den.where(den > 0, 1), 0) * factor
+    return df
+
+@pytest.mark.parametrize("geocolumn", GEOCOLUMNS)
+def test_day_reported(synthetic, geocolumn) :
+    for day in (synthetic.firstday(), synthetic.lastday()) :
+        result = synthetic.data_from_day(day, fill=False, geocolumn=geocolumn)
+        assert_same_frames(reference_day(synthetic.cdf, day, geocolumn), result, geocolumn)
+
+def test_day_reported_gap(synthetic) :
+    # a country without data one day is not counted in its groups this day
+    cdf = synthetic.cdf
+    dates = pd.to_datetime(cdf["Date"].astype(str)).dt.date
+    day = sorted(set(dates))[-5]
+    country = cdf.loc[dates == day, "Country"].iloc[0]
+    cdf = cdf[~ ((cdf["Country"] == country) & (dates == day))]
+
+    cube = CubeCoronaData(cdf)
+    for geocolumn in GEOCOLUMNS :
+        assert_same_frames(reference_day(cdf, day, geocolumn), cube.data_from_day(day, fill=False, geocolumn=geocolumn), geocolumn)
+
+def test_day_reported_popsize(synthetic) :
+    # a continent PopSize only counts the countries reporting this day
+    day = synthetic.firstday()
+    reported = synthetic.data_from_day(day, fill=False, geocolumn="Continent")
+    filled = synthetic.data_from_day(day, fill=True, geocolumn="Continent")
+    assert reported["PopSize"].sum() < filled["PopSize"].sum()
+
+@pytest.mark.parametrize("geocolumn", GEOCOLUMNS)
+def test_top_reported(synthetic, geocolumn) :
+    day = synthetic.firstday()
+    top = synthetic.top_from_day("CO10K", n=3, day=day, geocolumn=geocolumn)
+    expected = synthetic.data_from_day(day, fill=False, geocolumn=geocolumn)
+    assert np.allclose(top["CO10K"], expected["CO10K"].sort_values(ascending=False).head(3))
+
+# ---------------------------------------------------------------------------
+
+@pytest.fixture(scope="module")
+def pgcd() :
+    pycoronadata = pytest.importorskip("pycoronadata")
+    return pycoronadata.PersistantGeoCoronaData(fname=DATA_FNAME)
+
+@pytest.fixture(scope="module")
+def cube(pgcd) :
+    return CubeCoronaData(pgcd.cdf, pgcd)
+
+def sample_days(pgcd, count=5) :
+    days = pd.date_range(pgcd.firstday(), pgcd.lastday()).date
+    return list(days[np.linspace(0, len(days) - 1, count).astype(int)])
+
+@pytest.mark.parametrize("fill", [False, True])
+@pytest.mark.parametrize("geocolumn", GEOCOLUMNS)
+def test_pgcd_day(pgcd, cube, geocolumn, fill) :
+    for day in sample_days(pgcd) :
+        expected = pgcd.data_from_day(day=day, fill=fill, geocolumn=geocolumn)
+        result = cube.data_from_day(day=day, fill=fill, geocolumn=geocolumn)
+        assert_same_frames(expected, result, geocolumn)
+
+@pytest.mark.parametrize("fill", [False, True])
+@pytest.mark.parametrize("geocolumn", GEOCOLUMNS)
+def test_pgcd_location(pgcd, cube, geocolumn, fill) :
+    for location in cube.unique(geocolumn)[:: 10] :
+        expected = pgcd.data_from_geocol(location, geocolumn, fill=fill)
+        result = cube.data_from_geocol(location, geocolumn, fill=fill)
+        assert_same_frames(expected.assign(Date=expected["Date"].astype(str)), result.assign(Date=result["Date"].astype(str)), "Date")
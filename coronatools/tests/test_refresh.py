@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 20:06:12
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 20:06:12
+
+import os
+import stat
+
+import pandas as pd
+
+from dataset import refresh
+
+def frame(synthetic) :
+    return synthetic.cdf.astype({"Country" : str, "Date" : str}).sample(frac=1, random_state=0)
+
+def test_save_sorted_and_versioned(synthetic, tmp_path) :
+    fname = str(tmp_path / "data.csv")
+    df = frame(synthetic)
+
+    assert refresh.save(fname, df)
+    saved = pd.read_csv(fname)
+    assert len(saved) == len(df)
+    assert saved[refresh.KEYS].equals(saved[refresh.KEYS].sort_values(refresh.KEYS))
+    assert refresh.read_version(fname) == 1
+
+    # same content, nothing written
+    assert not refresh.save(fname, df)
+    assert refresh.read_version(fname) == 1
+
+def test_save_applies_removed_rows(synthetic, tmp_path) :
+    fname = str(tmp_path / "data.csv")
+    df = frame(synthetic)
+    refresh.save(fname, df)
+
+    removed = df["Country"].iloc[0]
+    assert refresh.save(fname, df[df["Country"] != removed])
+
+    saved = pd.read_csv(fname)
+    assert removed not in set(saved["Country"])
+    assert len(saved) == (df["Country"] != removed).sum()
+    assert refresh.read_version(fname) == 2
+
+def test_save_keeps_mode(synthetic, tmp_path) :
+    fname = str(tmp_path / "data.csv")
+    df = frame(synthetic)
+    refresh.save(fname, df)
+    os.chmod(fname, 0o644)
+
+    refresh.save(fname, df.head(10))
+    assert stat.S_IMODE(os.stat(fname).st_mode) == 0o644
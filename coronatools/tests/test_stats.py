@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+# @Author: jsgounot
+# @Date:   2026-10-17 20:01:39
+# @Last modified by:   jsgounot
+# @Last Modified time: 2026-10-17 20:01:39
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from dataset import stats
+
+def test_metric_stats(synthetic) :
+    summary = stats.stats(synthetic, "Confirmed")
+    assert summary.min == synthetic.cdf["Confirmed"].min()
+    assert summary.max == synthetic.cdf["Confirmed"].max()
+
+def test_attribute_stats(synthetic) :
+    # PopSize is a static attribute, not a cube metric
+    summary = stats.stats(synthetic, "PopSize")
+    assert summary.min == synthetic.cdf["PopSize"].min()
+    assert summary.max == synthetic.cdf["PopSize"].max()
+
+    day = synthetic.lastday()
+    reported = synthetic.data_from_day(day)
+    assert stats.stats(synthetic, "PopSize", day=day).max == reported["PopSize"].max()
+
+def test_attribute_stats_level(synthetic) :
+    summary = stats.stats(synthetic, "PopSize", geocolumn="Continent")
+    countries = synthetic.cdf.drop_duplicates("Country")
+    assert summary.max == countries.groupby("Continent", observed=True)["PopSize"].sum().max()
+
+def test_attribute_stats_pgcd(synthetic) :
+    # pgcd backend, the catalog is built on cdf
+    pgcd = SimpleNamespace(cdf=synthetic.cdf)
+    summary = stats.stats(pgcd, "PopSize")
+    assert np.isclose(summary.posmin, synthetic.cdf["PopSize"][synthetic.cdf["PopSize"] > 0].min())